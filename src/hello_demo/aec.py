@@ -0,0 +1,122 @@
+from __future__ import annotations
+import threading, time
+from collections import deque
+import numpy as np
+from .resample import resample
+
+class PlaybackReference:
+    """
+    WavPlayback が鳴らしている信号を（時刻, サンプル）で保持する。
+    キャプチャ側はブロックの時刻で read() し、エコーキャンセラの参照信号にする。
+    時刻は time.monotonic() 基準。
+    """
+
+    def __init__(self, rate: int, keep_sec: float = 30.0):
+        self.rate = rate
+        self.keep_sec = keep_sec
+        self._segs: deque[tuple[float, np.ndarray]] = deque()
+        self._lock = threading.Lock()
+
+    def push(self, samples: np.ndarray, sample_rate: int, t_start: float | None = None) -> None:
+        x = resample(np.asarray(samples, dtype=np.float32), sample_rate, self.rate)
+        t = time.monotonic() if t_start is None else t_start
+        with self._lock:
+            self._segs.append((t, x))
+            # 古いセグメントは捨てる（keep_sec より前に終わったもの）
+            while self._segs and self._segs[0][0] + len(self._segs[0][1]) / self.rate < t - self.keep_sec:
+                self._segs.popleft()
+
+    def read(self, t0: float, n: int) -> np.ndarray:
+        """時刻 t0 から n サンプル分の再生信号（鳴っていない区間は 0）"""
+        out = np.zeros(n, dtype=np.float32)
+        with self._lock:
+            segs = list(self._segs)
+        for ts, x in segs:
+            off = int(round((ts - t0) * self.rate))  # out 上でのセグメント先頭位置
+            a, b = max(0, off), min(n, off + len(x))
+            if a < b:
+                out[a:b] += x[a - off:b - off]
+        return out
+
+class EchoCanceller:
+    """
+    分割ブロック周波数領域適応フィルタ（PBFDAF, overlap-save, 正規化 LMS）。
+    mic ブロックから参照信号（再生中の TTS）由来のエコー推定を差し引き、
+    さらに残留エコーだけで説明できるブロックは減衰させる（ミュートはしない）。
+    ブロック長は block_samples 固定（VADRecorder のブロックと同じ）。
+    """
+
+    def __init__(self, reference: PlaybackReference, block_samples: int, tail_ms: int = 500,
+                 mu: float = 2.0, lead_ms: int = 50, suppress: bool = True, floor: float = 0.1):
+        self.ref = reference
+        self.rate = reference.rate
+        self.N = int(block_samples)
+        self.P = max(1, int(np.ceil(tail_ms * self.rate / 1000.0 / self.N)))
+        self.mu = mu
+        self.lead = lead_ms / 1000.0  # キャプチャ時刻の遅れ分、参照を早めに読む
+        self.suppress = suppress
+        self.floor = floor
+        self.reset()
+
+    def reset(self) -> None:
+        K = self.N + 1
+        self.X = np.zeros((self.P, K), dtype=np.complex64)  # 参照スペクトルの遅延線
+        self.W = np.zeros((self.P, K), dtype=np.complex64)  # 各分割のフィルタ係数
+        self._prev = np.zeros(self.N, dtype=np.float32)
+        self._idle = self.P  # 参照が無音だったブロック数
+        self._erle = 1.0     # 平滑化 ERLE（エコーのみ区間で更新）
+        self._hold = 0       # ダブルトーク検出後の適応停止ブロック数
+        self._gain = 1.0
+
+    def process(self, mic: np.ndarray, t0: float) -> np.ndarray:
+        n = len(mic)
+        N = self.N
+        ref = self.ref.read(t0 - self.lead, N)
+        if not ref.any():
+            self._idle += 1
+            if self._idle > self.P:
+                # 遅延線がすべて無音 -> そのまま通す（FFT も省略）
+                self._prev[:] = 0.0
+                self._gain = 1.0
+                return mic
+        else:
+            self._idle = 0
+        d = np.zeros(N, dtype=np.float32)
+        d[:min(n, N)] = mic[:N]
+
+        Xn = np.fft.rfft(np.concatenate([self._prev, ref]))
+        self._prev = ref
+        self.X[1:] = self.X[:-1]
+        self.X[0] = Xn
+        y = np.fft.irfft((self.W * self.X).sum(axis=0), 2 * N)[N:].astype(np.float32)
+        e = d - y
+
+        Ed = float(np.dot(d, d)) + 1e-10
+        Ee = float(np.dot(e, e)) + 1e-10
+        Ey = float(np.dot(y, y))
+        erle = Ed / Ee
+        converged = self._erle > 4.0
+        if converged and erle < 1.5 and Ee > 4.0 * Ey / self._erle:
+            self._hold = 5  # 近端話者あり（ダブルトーク）-> 係数を守る
+        if self._hold > 0:
+            self._hold -= 1
+        else:
+            # 正規化 LMS 更新（勾配拘束付き）
+            E = np.fft.rfft(np.concatenate([np.zeros(N, dtype=np.float32), e]))
+            pw = (np.abs(self.X) ** 2).sum(axis=0)
+            pw += pw.mean() + 1e-6 * N  # 帯域ごとの過大ステップを抑える正則化
+            G = self.mu * np.conj(self.X) * (E / pw)
+            g = np.fft.irfft(G, 2 * N, axis=1)[:, :N]
+            self.W += np.fft.rfft(np.concatenate([g, np.zeros_like(g)], axis=1), axis=1).astype(np.complex64)
+            self._erle = 0.9 * self._erle + 0.1 * min(erle, 1000.0)
+
+        if self.suppress and Ey > 0.0:
+            # エコー推定で説明できる割合: mic とエコー推定の相関（未収束でも効く）と
+            # 残留エコー推定 Ey/ERLE の大きい方。近端の声が乗ると相関は下がる
+            rho2 = float(np.dot(d, y)) ** 2 / (Ed * Ey)
+            frac = max(rho2, Ey / max(self._erle, 1.0) / Ee)
+            g_target = float(np.clip(1.0 - 1.5 * frac, self.floor, 1.0))
+            # 減衰は速く、復帰も速く（近端の頭を削らない）
+            self._gain = g_target if g_target < self._gain else 0.5 * self._gain + 0.5 * g_target
+            e = e * self._gain
+        return e[:n]
@@ -1,11 +1,16 @@
 ﻿from __future__ import annotations
 from typing import Optional, Any, List, Dict
-import json, os, re, unicodedata, time, sys
+import json, os, time, sys, threading
 from .config import Config
-from .audio_io import VADRecorder, float_to_pcm16, pack_wav
+from .audio_io import VADRecorder
+from .frame import AudioFrame
 from .tts import TTSBase
 from .stt import STTBase
 from .playback import WavPlayback
+from .aec import PlaybackReference, EchoCanceller
+from .keywords import KeywordMatcher, KeywordMatch
+from .kws import KeywordSpotter, KwsResult
+from .endpoint import build_endpointer, japanese_completion
 
 class HelloApp:
     def __init__(self, cfg: Config, tts_client: TTSBase, stt_client: Optional[STTBase] = None,
@@ -13,7 +18,7 @@ class HelloApp:
         self.cfg = cfg
         self.tts = tts_client
         self.stt = stt_client
-        self.playback = WavPlayback()
+        self.playback = WavPlayback(output_rate=cfg.playback_rate)
         self.on_user = on_user
         self.on_system = on_system
 
@@ -28,8 +33,23 @@ class HelloApp:
             except Exception as e:
                 print(f"[Keywords] Failed to load {cfg.keywords_file}: {e}")
                 self.keyword_map = None
+        # 表記ゆれ・読み・小さな誤認識を吸収する索引付きマッチャ
+        self.matcher: KeywordMatcher | None = None
+        self.last_match: KeywordMatch | None = None
+        if self.keyword_map:
+            self.matcher = KeywordMatcher(self.keyword_map, max_ratio=cfg.fuzzy_ratio,
+                                          max_edits=cfg.fuzzy_max_edits)
+        # 例示音声のテンプレート照合（明らかに違う発話は STT に回さない）
+        self.spotter: KeywordSpotter | None = None
+        if cfg.kws and self.keyword_map:
+            self.spotter = KeywordSpotter(self.keyword_map, base_dir=os.path.dirname(cfg.keywords_file) or ".",
+                                          rate=cfg.rate)
+            if not len(self.spotter):
+                print("[KWS] no \"examples\" in keywords file -> disabled")
+                self.spotter = None
 
         self.utt_count = 0
+        self.stop_event = threading.Event()  # stop() で run() のループを抜ける
         self._armed_until = 0.0
         self._is_windows = (sys.platform.startswith("win"))
         hk = (self.cfg.hotkey or "SPACE").upper()
@@ -46,32 +66,11 @@ class HelloApp:
             except Exception as e:
                 print(f"[VAD-Seq] Failed to load sequence: {e}")
 
-    @staticmethod
-    def _norm(s: str | None) -> str:
-        if not s:
-            return ""
-        s = unicodedata.normalize("NFKC", s)
-        s = "".join(s.split()).lower()
-        return s
-
     def _match_from_map(self, text: str | None) -> dict | None:
-        if not self.keyword_map:
+        if not self.matcher:
             return None
-        t = self._norm(text)
-        for entry in self.keyword_map:
-            patterns = entry.get("match") or entry.get("keywords") or []
-            use_regex = bool(entry.get("regex"))
-            for p in patterns:
-                if use_regex:
-                    try:
-                        if re.search(p, text or ""):
-                            return entry
-                    except re.error as e:
-                        print(f"[Keywords] Bad regex '{p}': {e}")
-                else:
-                    if self._norm(str(p)) in t:
-                        return entry
-        return None
+        self.last_match = self.matcher.match(text)
+        return self.last_match.entry if self.last_match else None
 
     def _poll_hotkey(self):
         if not self.cfg or self.cfg.gate != "hotkey":
@@ -172,34 +171,106 @@ class HelloApp:
         return None
 
     # ---- 追加: TTS 統一ヘルパ ----
+    def synthesize(self, text: str) -> bytes | None:
+        """TTSで合成した WAV bytes（再生はしない）"""
+        if not text:
+            return None
+        return self.tts.speak(text) or None  # VoiceVoxTTS.speak() は WAV bytes を返す設計
+
     def _speak_text(self, text: str) -> None:
         """TTSで合成してバイト再生（常用パス）"""
         if not text:
             return
         try:
-            wav_bytes = self.tts.speak(text)  # VoiceVoxTTS.speak() は WAV bytes を返す設計
-            if wav_bytes:
-                self.playback.play_bytes(wav_bytes)
+            self.playback.play_frame(self.tts.synthesize_frame(text))
         except Exception as e:
             print(f"[TTS] speak failed: {e}")
 
-    def run(self) -> None:
+    def _say_for(self, entry: dict, text: str | None) -> str:
+        # say優先（textでも可）。無ければマッチワードをそのまま読む
+        return entry.get("say") or entry.get("text") or self.cfg.keyword or (text or "")
+
+    def spot(self, utter) -> tuple[str, KwsResult | None]:
+        """STT 前の判定: "reject"（STT 不要・応答なし）/ "accept"（STT なしで応答）/ "stt"（従来どおり STT）"""
+        if self.spotter is None:
+            return "stt", None
+        hit = self.spotter.spot(utter, self.cfg.rate)
+        if self.cfg.kws_accept > 0 and hit.entry is not None and hit.score <= self.cfg.kws_accept:
+            print(f"[KWS] accept entry#{hit.index} score={hit.score:.3f} ({hit.example})")
+            return "accept", hit
+        # テンプレートのないエントリがあるときは「どれでもない」と言えないので STT に回す
+        if self.spotter.complete and hit.score > self.cfg.kws_reject:
+            print(f"[KWS] reject score={hit.score:.3f} -> skip STT")
+            return "reject", hit
+        return "stt", hit
+
+    def reply_for(self, text: str | None) -> str | None:
+        """keyword モードの応答文（応答しないなら None）"""
+        if self.keyword_map:
+            entry = self._match_from_map(text)
+            if entry:
+                say = self._say_for(entry, text)
+                print(f"[Mode:keyword] Matched entry -> say={say!r}")
+                return say
+            print("[Mode:keyword] No mapping matched.")
+            return None
+        # シンプルに cfg.keyword が含まれていれば応答
+        if text and self.cfg.keyword in text:
+            print("[Mode:keyword] Keyword detected. Responding...")
+            return self.cfg.keyword
+        print("[Mode:keyword] Keyword not found.")
+        return None
+
+    def _completion(self, partial: str) -> float | None:
+        """途中結果の完結度: キーワードが入っていれば応答に足りる、無ければ語尾で判断"""
+        if self.matcher is not None and partial and self.matcher.match(partial, log=False):
+            return 0.9
+        return japanese_completion(partial)
+
+    def build_endpointer(self):
+        """cfg.endpoint="adaptive" のときの AdaptiveEndpointer（partial は open_stream できる STT のみ）"""
+        cfg = self.cfg
+        stream_factory = None
+        if cfg.endpoint == "adaptive" and cfg.endpoint_partials:
+            if hasattr(self.stt, "open_stream"):
+                stream_factory = lambda: self.stt.open_stream(cfg.rate)
+            else:
+                print("[Endpoint] STT has no streaming interface -> partials disabled")
+        ep = build_endpointer(cfg, stream_factory=stream_factory, completion=self._completion)
+        if ep is not None:
+            print(f"[Endpoint] adaptive {ep.min_ms}-{ep.max_ms} ms (base {ep.base_ms} ms, "
+                  f"partials {'on' if stream_factory else 'off'})")
+        return ep
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def run(self, rec: VADRecorder | None = None) -> None:
+        """rec を渡すとそれを使う（テスト・ソーク用の差し替え）。stop() まで回る"""
         cfg = self.cfg
-        rec = VADRecorder(
-            rate=cfg.rate, block_ms=cfg.block_ms, energy_threshold=cfg.energy_threshold,
-            min_speech_ms=cfg.min_speech_ms, min_silence_ms=cfg.min_silence_ms,
-            device=cfg.device,
-        )
+        if rec is None:
+            rec = VADRecorder(
+                rate=cfg.rate, block_ms=cfg.block_ms, energy_threshold=cfg.energy_threshold,
+                min_speech_ms=cfg.min_speech_ms, min_silence_ms=cfg.min_silence_ms,
+                device=cfg.device, capture_rate=cfg.capture_rate,
+                max_utterance_ms=cfg.max_utterance_ms, max_queue_ms=cfg.max_queue_ms,
+                endpointer=self.build_endpointer(),
+            )
+        if cfg.aec:
+            # 自分の TTS がマイクに回り込んで発話扱いされるのを防ぐ
+            ref = PlaybackReference(cfg.rate)
+            self.playback.reference = ref
+            rec.echo_canceller = EchoCanceller(ref, rec.block_samples, tail_ms=cfg.aec_tail_ms)
+            print(f"[AEC] enabled (tail {cfg.aec_tail_ms} ms)")
         rec.start()
         print("\nSpeak into the microphone. Ctrl+C to quit.\n")
         try:
-            while True:
+            while not self.stop_event.is_set():
                 self._poll_hotkey()
-                utter = rec.get_utterance()
+                utter = rec.get_utterance(timeout=0.5)
                 if utter is None:
                     continue
-                pcm = float_to_pcm16(utter)
-                wav_bytes = pack_wav(pcm, sample_rate=cfg.rate, num_channels=1)
+                frame = AudioFrame.from_float(utter, cfg.rate)  # WAV には詰めずに渡す
 
                 if cfg.mode == "end":
                     if not self._should_play_vad():
@@ -230,35 +301,26 @@ class HelloApp:
                     continue
 
                 if cfg.mode == "keyword":
-                    if self.stt is None:
-                        print("[Mode:keyword] No STT client provided.")
+                    decision, hit = self.spot(utter)
+                    if decision == "reject":
                         continue
-                    text = self.stt.transcribe(wav_bytes, sample_rate=cfg.rate)
-                    print(f"[STT] Transcript: {text}")
-                    if self.on_user:
-                        self.on_user(text or "")
-
-                    if self.keyword_map:
-                        entry = self._match_from_map(text)
-                        if entry:
-                            # say優先（textでも可）。無ければマッチワードをそのまま読む
-                            say = entry.get("say") or entry.get("text") or cfg.keyword or (text or "")
-                            if self.on_system:
-                                self.on_system(f"読み上げ: {say[:40]}{'...' if len(say) > 40 else ''}")
-                            print(f"[Mode:keyword] Matched entry -> say={say!r}")
-                            self._speak_text(say)
-                        else:
-                            print("[Mode:keyword] No mapping matched.")
+                    if decision == "accept":
+                        if self.on_user:
+                            self.on_user(f"(KWS) {(hit.entry.get('match') or [''])[0]}")
+                        say = self._say_for(hit.entry, None)
                     else:
-                        # シンプルに cfg.keyword が含まれていれば応答
-                        if text and cfg.keyword in text:
-                            print("[Mode:keyword] Keyword detected. Responding...")
-                            say = cfg.keyword
-                            if self.on_system:
-                                self.on_system(f"読み上げ: {say}")
-                            self._speak_text(say)
-                        else:
-                            print("[Mode:keyword] Keyword not found.")
+                        if self.stt is None:
+                            print("[Mode:keyword] No STT client provided.")
+                            continue
+                        text = self.stt.transcribe_frame(frame)
+                        print(f"[STT] Transcript: {text}")
+                        if self.on_user:
+                            self.on_user(text or "")
+                        say = self.reply_for(text)
+                    if say:
+                        if self.on_system:
+                            self.on_system(f"読み上げ: {say[:40]}{'...' if len(say) > 40 else ''}")
+                        self._speak_text(say)
                     continue
 
                 print(f"[App] Unknown mode: {cfg.mode}")
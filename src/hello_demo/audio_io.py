@@ -1,7 +1,7 @@
 from __future__ import annotations
 import io, queue, time
 import numpy as np
-import sounddevice as sd
+from .resample import PolyphaseResampler
 
 def float_to_pcm16(wave: np.ndarray) -> bytes:
     wave = np.asarray(wave)
@@ -27,9 +27,40 @@ def pack_wav(pcm_bytes: bytes, sample_rate: int, num_channels: int = 1) -> bytes
         buf.write(pcm_bytes)
         return buf.getvalue()
 
+def pcm16_to_float(pcm_bytes: bytes, num_channels: int = 1) -> np.ndarray:
+    x = np.frombuffer(pcm_bytes, dtype=np.int16)
+    if num_channels > 1:
+        x = x.reshape(-1, num_channels)[:, 0]
+    return x.astype(np.float32) / 32767.0
+
+def unpack_wav(wav_bytes: bytes) -> tuple[np.ndarray, int]:
+    """16-bit PCM WAV -> (float32 mono, sample_rate)"""
+    import wave
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError("16-bit PCM required")
+        n_channels = wf.getnchannels()
+        rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+    return pcm16_to_float(frames, n_channels), rate
+
+def device_rate(device=None, kind: str = "input") -> int | None:
+    """デバイスのネイティブサンプルレート（取得できなければ None）"""
+    try:
+        import sounddevice as sd
+        info = sd.query_devices(device, kind)
+        return int(info["default_samplerate"])
+    except Exception as e:
+        print(f"[Audio] cannot query {kind} device rate: {e}")
+        return None
+
 class VADRecorder:
     def __init__(self, rate: int, block_ms: int, energy_threshold: float,
-                 min_speech_ms: int, min_silence_ms: int, device=None):
+                 min_speech_ms: int, min_silence_ms: int, device=None,
+                 capture_rate: int | None = None, echo_canceller=None,
+                 max_utterance_ms: int | None = 15000, max_queue_ms: int | None = 5000,
+                 endpointer=None):
+        # rate は VAD/STT 側の処理レート。capture_rate はデバイス側（None=ネイティブ）
         self.rate = rate
         self.block_ms = block_ms
         self.energy_threshold = energy_threshold
@@ -37,7 +68,14 @@ class VADRecorder:
         self.min_silence_blocks = max(1, int(min_silence_ms / block_ms))
         self.block_samples = int(rate * (block_ms / 1000.0))
         self.device = device
-        self.q: queue.Queue = queue.Queue()
+        self.capture_rate = capture_rate
+        self.resampler: PolyphaseResampler | None = None
+        self.echo_canceller = echo_canceller  # EchoCanceller（任意）
+        # 長時間の騒音で発話が終わらない／処理が詰まったときに溜め込み続けない上限
+        self.max_utterance_blocks = max(1, int(max_utterance_ms / block_ms)) if max_utterance_ms else None
+        self.q: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue_ms / block_ms)) if max_queue_ms else 0)
+        self.dropped_blocks = 0
+        self.endpointer = endpointer  # AdaptiveEndpointer（None なら min_silence_ms 固定）
         self.stream = None
         self.in_speech = False
         self.speech_blocks = 0
@@ -51,12 +89,35 @@ class VADRecorder:
         data = _np.asarray(indata)
         if data.ndim == 2:
             data = data[:,0]
-        self.q.put(data.copy())
+        # ブロック先頭の時刻（エコーキャンセラが再生信号と突き合わせる）
+        t0 = time.monotonic() - frames / float(self.capture_rate or self.rate)
+        self._put((t0, data.copy()))
+
+    def _put(self, item) -> None:
+        """q が満杯なら古いブロックを捨てて入れる（コールバックは待たせない）"""
+        while True:
+            try:
+                self.q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.q.get_nowait()
+                    self.dropped_blocks += 1
+                    if self.dropped_blocks == 1 or self.dropped_blocks % 500 == 0:
+                        print(f"[Audio] queue full, dropped {self.dropped_blocks} blocks so far")
+                except queue.Empty:
+                    pass
 
     def start(self):
+        import sounddevice as sd
+        cap = self.capture_rate or device_rate(self.device, "input") or self.rate
+        self.capture_rate = cap
+        # ホスト API 任せにせずネイティブレートで開き、処理レートへは自前で変換する
+        self.resampler = PolyphaseResampler(cap, self.rate) if cap != self.rate else None
+        print(f"[Audio] capture {cap} Hz -> process {self.rate} Hz")
         self.stream = sd.InputStream(
-            samplerate=self.rate, channels=1, dtype='float32',
-            blocksize=self.block_samples, callback=self._callback,
+            samplerate=cap, channels=1, dtype='float32',
+            blocksize=int(cap * (self.block_ms / 1000.0)), callback=self._callback,
             device=self.device,
         )
         self.stream.start()
@@ -73,37 +134,68 @@ class VADRecorder:
         return float(_np.sqrt(_np.mean(_np.square(x))))
 
     def get_utterance(self, timeout=None):
-        import numpy as _np
         deadline = None if timeout is None else time.time() + timeout
         while True:
             if deadline is not None and time.time() > deadline:
                 return None
             try:
-                block = self.q.get(timeout=0.1)
+                t0, block = self.q.get(timeout=0.1)
             except queue.Empty:
                 continue
-            rms = self._rms(block)
-            voice = rms >= self.energy_threshold
-            if voice:
-                self.silence_blocks = 0
-                self.speech_blocks += 1
+            if self.resampler is not None:
+                block = self.resampler.process(block)
+            if self.echo_canceller is not None:
+                block = self.echo_canceller.process(block, t0)
+            utter = self.feed(block)
+            if utter is not None:
+                return utter
+
+    def feed(self, block):
+        """処理レートのブロックを 1 つ進める。発話が終わったらその波形を返す"""
+        import numpy as _np
+        ep = self.endpointer
+        rms = self._rms(block)
+        voice = rms >= self.energy_threshold
+        if ep is not None and (voice or self.in_speech):
+            ep.observe(block, rms, voice)
+        if voice:
+            self.silence_blocks = 0
+            self.speech_blocks += 1
+            self.buffer.append(block)
+            if not self.in_speech and self.speech_blocks >= self.min_speech_blocks:
+                self.in_speech = True
+                if ep is not None:
+                    ep.start(self.buffer)
+            if self.in_speech and self.max_utterance_blocks and len(self.buffer) >= self.max_utterance_blocks:
+                # 無音が来ないまま上限に達した（騒音・話し続け）: ここで切って出す
+                print(f"[VAD] utterance reached {self.max_utterance_blocks * self.block_ms} ms -> cut")
+                utter = _np.concatenate(self.buffer, axis=0)
+                self._reset_utterance()
+                return utter
+        else:
+            if self.in_speech:
+                self.silence_blocks += 1
                 self.buffer.append(block)
-                if not self.in_speech and self.speech_blocks >= self.min_speech_blocks:
-                    self.in_speech = True
+                limit = ep.limit_blocks() if ep is not None else self.min_silence_blocks
+                if self.silence_blocks >= limit:
+                    utter = _np.concatenate(self.buffer, axis=0)
+                    # 末尾の無音は実際に待った分だけ落とす
+                    tail = self.silence_blocks * self.block_samples
+                    if len(utter) > tail:
+                        utter = utter[:-tail]
+                    self._reset_utterance()
+                    return utter
             else:
-                if self.in_speech:
-                    self.silence_blocks += 1
-                    self.buffer.append(block)
-                    if self.silence_blocks >= self.min_silence_blocks:
-                        utter = _np.concatenate(self.buffer, axis=0)
-                        tail = self.min_silence_blocks * self.block_samples
-                        if len(utter) > tail:
-                            utter = utter[:-tail]
-                        self.in_speech = False
-                        self.speech_blocks = 0
-                        self.silence_blocks = 0
-                        self.buffer = []
-                        return utter
-                else:
-                    self.speech_blocks = 0
-                    self.buffer = []
\ No newline at end of file
+                if ep is not None and self.speech_blocks:
+                    ep.reset()
+                self.speech_blocks = 0
+                self.buffer = []
+        return None
+
+    def _reset_utterance(self) -> None:
+        self.in_speech = False
+        self.speech_blocks = 0
+        self.silence_blocks = 0
+        self.buffer = []
+        if self.endpointer is not None:
+            self.endpointer.reset()
@@ -0,0 +1,174 @@
+"""
+録音済み発話の一括書き起こし＋キーワード評価。
+
+  python -m hello_demo.batch ./recordings --keywords-file keywords.json --workers 8 --out result.jsonl
+
+入力はディレクトリ（配下の *.wav を再帰）かマニフェスト:
+  *.jsonl : {"path": "a.wav", "expect": "おー！"}   expect=null は「マッチしないのが正解」
+  その他  : 1 行 1 ファイル。タブ区切り 2 列目が expect（"-" はマッチなし）
+expect はキーワードエントリの say（無ければ text）で指定する。
+"""
+from __future__ import annotations
+import argparse, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from .frame import AudioFrame
+
+NO_MATCH = "(none)"
+
+# ワーカープロセスごとに 1 回だけ作る（モデルのロードはここで済ませる）
+_app = None
+_stt = None
+_rate = 16000
+
+def _init_worker(stt_name: str, keywords_file: Optional[str], rate: int) -> None:
+    global _app, _stt, _rate
+    from .config import Config
+    from .app import HelloApp
+    from .cli import build_stt
+    _rate = rate
+    _stt = build_stt(stt_name, keywords_file=keywords_file)
+    if _stt is None:
+        raise RuntimeError(f"STT backend unavailable: {stt_name}")
+    cfg = Config(mode="keyword", stt=stt_name, rate=rate, keywords_file=keywords_file)
+    _app = HelloApp(cfg, tts_client=None, stt_client=_stt)
+
+def entry_label(entry: Optional[Dict[str, Any]]) -> str:
+    if not entry:
+        return NO_MATCH
+    return str(entry.get("say") or entry.get("text") or entry.get("wav") or entry.get("match"))
+
+def _load_16k(path: str) -> Tuple[AudioFrame, float]:
+    with open(path, "rb") as f:
+        frame = AudioFrame.from_wav(f.read()).mono().resampled(_rate)
+    return frame, frame.duration
+
+def _process(path: str, expect: Any) -> Dict[str, Any]:
+    rec: Dict[str, Any] = {"path": path, "pid": os.getpid()}
+    if expect is not ...:
+        rec["expect"] = NO_MATCH if expect is None else str(expect)
+    try:
+        t0 = time.perf_counter()
+        frame, dur = _load_16k(path)
+        t1 = time.perf_counter()
+        text = _stt.transcribe_frame(frame)
+        t2 = time.perf_counter()
+        entry = _app._match_from_map(text)
+        t3 = time.perf_counter()
+        m = _app.last_match
+    except Exception as e:
+        rec["error"] = f"{type(e).__name__}: {e}"
+        return rec
+    rec.update({
+        "duration_s": round(dur, 3), "text": text or "", "match": entry_label(entry),
+        "load_s": round(t1 - t0, 4), "stt_s": round(t2 - t1, 4), "match_s": round(t3 - t2, 6),
+        "rtf": round((t2 - t1) / dur, 4) if dur > 0 else None,
+        "confidence": round(m.confidence, 3) if m else None,
+    })
+    if "expect" in rec:
+        rec["correct"] = (rec["match"] == rec["expect"])
+    return rec
+
+def load_items(src: str) -> List[Tuple[str, Any]]:
+    """(path, expect) の一覧。expect 未指定は Ellipsis、マッチなし期待は None"""
+    items: List[Tuple[str, Any]] = []
+    if os.path.isdir(src):
+        for root, _, files in os.walk(src):
+            for fn in sorted(files):
+                if fn.lower().endswith(".wav"):
+                    items.append((os.path.join(root, fn), ...))
+        return sorted(items)
+    base = os.path.dirname(os.path.abspath(src))
+    with open(src, "r", encoding="utf-8") as f:
+        for line in f:
+            s = line.strip()
+            if not s or s.startswith("#"):
+                continue
+            if src.lower().endswith(".jsonl"):
+                d = json.loads(s)
+                path = d.get("path") or d.get("wav")
+                expect = d["expect"] if "expect" in d else ...
+            else:
+                cols = s.split("\t")
+                path = cols[0]
+                expect = ... if len(cols) < 2 else (None if cols[1] in ("", "-") else cols[1])
+            items.append((path if os.path.isabs(path) else os.path.normpath(os.path.join(base, path)), expect))
+    return items
+
+def _pct(xs: List[float], q: float) -> Optional[float]:
+    if not xs:
+        return None
+    xs = sorted(xs)
+    return round(xs[min(len(xs) - 1, int(q * (len(xs) - 1) + 0.5))], 4)
+
+def summarize(records: List[Dict[str, Any]], wall_s: float, workers: int) -> Dict[str, Any]:
+    ok = [r for r in records if "error" not in r]
+    audio_s = sum(r["duration_s"] for r in ok)
+    stt_s = sum(r["stt_s"] for r in ok)
+    hits = sum(1 for r in ok if r["match"] != NO_MATCH)
+    out: Dict[str, Any] = {
+        "files": len(records), "errors": len(records) - len(ok), "workers": workers,
+        "hit": hits, "miss": len(ok) - hits,
+        "audio_s": round(audio_s, 2), "stt_cpu_s": round(stt_s, 2), "wall_s": round(wall_s, 2),
+        "rtf": round(stt_s / audio_s, 4) if audio_s else None,          # 1 コアあたり
+        "wall_rtf": round(wall_s / audio_s, 4) if audio_s else None,    # プール全体
+        "stt_s_p50": _pct([r["stt_s"] for r in ok], 0.5),
+        "stt_s_p95": _pct([r["stt_s"] for r in ok], 0.95),
+    }
+    labeled = [r for r in ok if "expect" in r]
+    if labeled:
+        conf: Dict[str, Dict[str, int]] = {}
+        for r in labeled:
+            row = conf.setdefault(r["expect"], {})
+            row[r["match"]] = row.get(r["match"], 0) + 1
+        correct = sum(1 for r in labeled if r["correct"])
+        pos = [r for r in labeled if r["expect"] != NO_MATCH]
+        neg = [r for r in labeled if r["expect"] == NO_MATCH]
+        out.update({
+            "labeled": len(labeled), "correct": correct,
+            "accuracy": round(correct / len(labeled), 4),
+            "recall": round(sum(1 for r in pos if r["correct"]) / len(pos), 4) if pos else None,
+            "false_accept": sum(1 for r in neg if r["match"] != NO_MATCH),
+            "confusion": conf,
+        })
+    return out
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Batch STT + keyword evaluation")
+    p.add_argument("input", help="WAV directory or manifest (.jsonl / .txt)")
+    p.add_argument("--keywords-file", type=str, default="keywords.json")
+    p.add_argument("--stt", choices=["vosk", "google"], default="vosk")
+    p.add_argument("--rate", type=int, default=16000)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--out", type=str, default="batch_results.jsonl")
+    p.add_argument("--summary", type=str, default=None, help="write aggregate JSON here too")
+    a = p.parse_args(argv)
+
+    items = load_items(a.input)
+    if not items:
+        print(f"[Batch] no WAV files in {a.input}")
+        return 1
+    workers = max(1, min(a.workers, len(items)))
+    print(f"[Batch] {len(items)} files, {workers} workers, stt={a.stt}")
+    records: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    with open(a.out, "w", encoding="utf-8") as fo, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(a.stt, a.keywords_file, a.rate)) as ex:
+        futs = [ex.submit(_process, path, expect) for path, expect in items]
+        for i, fut in enumerate(as_completed(futs), 1):
+            rec = fut.result()
+            records.append(rec)
+            fo.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            if i % 100 == 0 or i == len(futs):
+                print(f"[Batch] {i}/{len(futs)} done ({time.perf_counter() - t0:.1f}s)")
+    summary = summarize(records, time.perf_counter() - t0, workers)
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    print(text)
+    if a.summary:
+        with open(a.summary, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
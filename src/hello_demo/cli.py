@@ -1,5 +1,5 @@
 from __future__ import annotations
-import argparse, sys, os
+import argparse, json, sys, os
 project_src = os.path.join(os.path.dirname(os.path.dirname(__file__)))
 if project_src not in sys.path:
     sys.path.insert(0, project_src)
@@ -43,11 +43,18 @@ def build_stt(name: str, **kwargs) -> STTBase | None:
                 words += list(data.keys())
             # 文字列のみ＆重複排除
             grammar_words = sorted({w for w in words if isinstance(w, str) and w.strip()})
-        return VoskSTT(
+        vosk_kwargs = dict(
             model_path=os.environ.get("VOSK_MODEL_PATH") or "model",
             grammar_words=grammar_words  # ← メモリ上で渡す。ファイル不要
         )
-    if stt == "auto":
+        workers = int(kwargs.get("workers") or 0)
+        if workers > 0:
+            # 認識はワーカープロセスで（モデルもワーカー側でロード）
+            from .stt import ProcessSTT
+            return ProcessSTT(VoskSTT, vosk_kwargs, workers=workers,
+                              timeout=float(kwargs.get("timeout", 30.0)))
+        return VoskSTT(**vosk_kwargs)
+    if name == "auto":
         try:
             return GoogleSTT()
         except Exception as e:
@@ -59,20 +66,40 @@ def build_stt(name: str, **kwargs) -> STTBase | None:
             return None
     return None
 
-def parse_args() -> Config:
+def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Hello Demo")
     p.add_argument("--mode", choices=["keyword","end"], default="keyword")
     p.add_argument("--tts", choices=["pyttsx3", "voicevox"], default="voicevox")
     p.add_argument("--stt", choices=["auto","google","vosk"], default="auto")
+    p.add_argument("--stt-workers", type=int, default=0)
+    p.add_argument("--stt-timeout", type=float, default=30.0)
     p.add_argument("--device", type=int, default=None)
     p.add_argument("--rate", type=int, default=16000)
+    p.add_argument("--capture-rate", type=int, default=None)
+    p.add_argument("--playback-rate", type=int, default=None)
     p.add_argument("--block-ms", type=int, default=20)
     p.add_argument("--energy-threshold", type=float, default=0.005)
     p.add_argument("--min-speech-ms", type=int, default=150)
     p.add_argument("--min-silence-ms", type=int, default=250)
+    p.add_argument("--endpoint", choices=["fixed", "adaptive"], default="fixed",
+                   help="adaptive: experimental; on tools/endpoint_eval.py it sits on the same "
+                        "latency/premature-cut trade-off as fixed (no net gain yet)")
+    p.add_argument("--endpoint-min-ms", type=int, default=120)
+    p.add_argument("--endpoint-max-ms", type=int, default=900)
+    p.add_argument("--endpoint-partials", action="store_true",
+                   help="adaptive + Vosk partials (not yet evaluated)")
+    p.add_argument("--max-utterance-ms", type=int, default=15000)
+    p.add_argument("--max-queue-ms", type=int, default=5000)
+    p.add_argument("--aec", action="store_true")
+    p.add_argument("--aec-tail-ms", type=int, default=500)
     p.add_argument("--keyword", type=str, default="こんにちは")
     p.add_argument("--wav-file", type=str, default="./audio/konnichiwa.wav")
     p.add_argument("--keywords-file", type=str, default=None)
+    p.add_argument("--fuzzy-ratio", type=float, default=0.2)
+    p.add_argument("--fuzzy-max-edits", type=int, default=2)
+    p.add_argument("--kws", action="store_true")
+    p.add_argument("--kws-reject", type=float, default=0.4)
+    p.add_argument("--kws-accept", type=float, default=0.0)
     p.add_argument("--gate", choices=["none","nth","every","hotkey"], default="none")
     p.add_argument("--respond-on", type=str, default=None)
     p.add_argument("--every-n", type=int, default=None)
@@ -86,21 +113,35 @@ def parse_args() -> Config:
     p.add_argument("--voicevox-pitch", type=float, default=0.0)
     p.add_argument("--voicevox-intonation", type=float, default=1.0)
     p.add_argument("--voicevox-volume", type=float, default=1.0)
-    a = p.parse_args()
+    return p
+
+def config_from_args(a: argparse.Namespace) -> Config:
     return Config(
         mode=a.mode, tts=a.tts, stt=a.stt, device=a.device,
-        rate=a.rate, block_ms=a.block_ms, energy_threshold=a.energy_threshold,
+        stt_workers=a.stt_workers, stt_timeout=a.stt_timeout,
+        rate=a.rate, capture_rate=a.capture_rate, playback_rate=a.playback_rate,
+        block_ms=a.block_ms, energy_threshold=a.energy_threshold,
         min_speech_ms=a.min_speech_ms, min_silence_ms=a.min_silence_ms,
+        endpoint=a.endpoint, endpoint_min_ms=a.endpoint_min_ms, endpoint_max_ms=a.endpoint_max_ms,
+        endpoint_partials=a.endpoint_partials,
+        max_utterance_ms=a.max_utterance_ms, max_queue_ms=a.max_queue_ms,
+        aec=a.aec, aec_tail_ms=a.aec_tail_ms,
         keyword=a.keyword, wav_file=a.wav_file, keywords_file=a.keywords_file,
+        fuzzy_ratio=a.fuzzy_ratio, fuzzy_max_edits=a.fuzzy_max_edits,
+        kws=a.kws, kws_reject=a.kws_reject, kws_accept=a.kws_accept,
         gate=a.gate, respond_on=a.respond_on, every_n=a.every_n,
         hotkey=a.hotkey, arm_window_ms=a.arm_window_ms,
         sequence_file=a.sequence_file, loop_sequence=a.loop_sequence,
     )
 
+def parse_args() -> Config:
+    return config_from_args(build_parser().parse_args())
+
 def main():
     cfg = parse_args()
-    tts_client = build_tts(cfg.tts, cfg.wav_file)
-    stt_client = build_stt(cfg.stt) if cfg.mode == "keyword" else None
+    tts_client = build_tts(cfg.tts)
+    stt_client = (build_stt(cfg.stt, workers=cfg.stt_workers, timeout=cfg.stt_timeout)
+                  if cfg.mode == "keyword" else None)
     app = HelloApp(cfg, tts_client, stt_client)
     print(f"[Config] {cfg}")
     app.run()
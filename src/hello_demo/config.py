@@ -7,17 +7,34 @@ class Config:
     mode: str = "keyword"            # "keyword" or "end"
     tts: str = "wav"                  # "wav" or "pyttsx3"
     stt: str = "auto"                 # "auto", "google", "vosk"
+    stt_workers: int = 0              # >0: Vosk をワーカープロセスで動かす
+    stt_timeout: float = 30.0         # ワーカー 1 リクエストの上限（秒）
     device: Optional[int] = None
-    rate: int = 16000
+    rate: int = 16000                 # VAD/STT の処理レート
+    capture_rate: Optional[int] = None   # 入力デバイスのレート（None=ネイティブ）
+    playback_rate: Optional[int] = None  # 出力デバイスのレート（None=ネイティブ, 0=変換なし）
     block_ms: int = 30
     energy_threshold: float = 0.015
     min_speech_ms: int = 200
     min_silence_ms: int = 500
+    endpoint: str = "fixed"           # "fixed"（min_silence_ms 固定）| "adaptive"（発話ごとに調整）
+    endpoint_min_ms: int = 120        # adaptive の無音タイムアウト下限
+    endpoint_max_ms: int = 900        # 同 上限
+    endpoint_partials: bool = False   # adaptive: Vosk の途中結果で文の完結度も見る
+    max_utterance_ms: int = 15000     # 無音が来なくてもこの長さで発話を切る（0=無制限）
+    max_queue_ms: int = 5000          # 処理待ちキューの上限（超えたら古いブロックを捨てる, 0=無制限）
+    aec: bool = False                 # 再生信号を参照にしたエコーキャンセル
+    aec_tail_ms: int = 500            # エコー経路（出力遅延込み）の想定長
 
     keyword: str = "こんにちは"
     wav_file: str = "./audio/konnichiwa.wav"
 
     keywords_file: Optional[str] = None
+    fuzzy_ratio: float = 0.2          # あいまい一致の許容編集距離（パターン長に対する比, 0=完全一致のみ）
+    fuzzy_max_edits: int = 2
+    kws: bool = False                 # keywords.json の "examples" で STT 前に絞り込む
+    kws_reject: float = 0.4           # スポッタ距離がこれより大きければ STT を省く
+    kws_accept: float = 0.0           # これ以下なら STT なしで応答（0=常に STT で確認）
 
     gate: str = "none"                  # "none"|"nth"|"every"|"hotkey"
     respond_on: Optional[str] = None
@@ -0,0 +1,165 @@
+"""
+発話終端の待ち時間（無音タイムアウト）を発話ごとに変える適応エンドポインタ。
+
+固定の min_silence_ms は、短くすると言いよどみで切れ、長くすると毎回の応答が遅れる。
+ここでは無音に入った時点で次の手がかりからタイムアウトを決め直す。
+  - エネルギーの減衰: 文末は声がしぼんで終わり、言いよどみは声量を保ったまま途切れる
+  - 話速: 速く話す人は間も短い（音節のピーク数 / 有声時間）
+  - 途中結果（任意）: ストリーミング STT の partial が文として閉じているか
+    （キーワードを含む・終助詞や「です/ます」で終わる → 短く、助詞や「て」で終わる → 長く）
+
+実験的。tools/endpoint_eval.py の合成セッションでは、既定の重みの adaptive は固定タイムアウトと
+同じ遅延／途中切れの曲線上にあり、正味の改善はまだない（partial 込みの構成は未評価）。
+
+  ep = AdaptiveEndpointer(block_ms=20, base_ms=250)
+  VADRecorder(..., endpointer=ep)
+"""
+from __future__ import annotations
+import math
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+# partial の末尾による「文が閉じていそうか」の目安（Vosk の日本語モデルは語ごとに空白区切り）
+_CLOSED_ENDINGS = ("です", "ます", "でした", "ました", "ください", "ません", "ですね", "ですか",
+                   "ね", "よ", "か", "な", "わ", "た", "だ", "ない", "しょう", "こんにちは", "こんばんは")
+_OPEN_ENDINGS = ("は", "が", "を", "に", "で", "と", "の", "へ", "も", "や", "て", "って", "けど",
+                 "から", "し", "ので", "のに", "えーと", "えっと", "あの", "その", "まあ")
+_OPEN_BY_LEN = sorted(_OPEN_ENDINGS, key=len, reverse=True)  # 「ので」を「で」より先に見る
+
+def japanese_completion(text: str | None) -> Optional[float]:
+    """partial の末尾から文が完結している確からしさ（0..1）。判断できなければ None"""
+    t = "".join((text or "").split())
+    if not t:
+        return None
+    for end in _OPEN_BY_LEN:
+        if t.endswith(end):
+            # 「こんにちは」のように、より長い閉じた語尾なら閉じている方を採る
+            if any(t.endswith(c) and len(c) > len(end) for c in _CLOSED_ENDINGS):
+                break
+            return 0.15
+    for end in _CLOSED_ENDINGS:
+        if t.endswith(end):
+            return 0.85
+    return 0.5
+
+class AdaptiveEndpointer:
+    """
+    VADRecorder.feed から呼ばれ、現在の発話に対する無音タイムアウト（ブロック数）を返す。
+
+    timeout = base_ms × 減衰係数 × 話速係数 × 完結度係数 を [min_ms, max_ms] に収める。
+      減衰係数: 発話中央値から直近の有声ブロックまでの下がり幅が decay_db[0] 以下なら 1.8、decay_db[1] 以上なら 0.5
+      話速係数: nominal_rate / 実測の音節レート（0.75〜1.33。ここのピーク数えでの日本語の中央値が 5.5 前後）
+      完結度係数: 1.5 - p（p = completion(partial)、partial が無ければ 1.0）
+
+    stream_factory を渡すと発話開始時に 1 本ストリームを開いてブロックを流し込み、
+    無音中は partial を completion に渡して評価する（VoskSTT.open_stream を想定）。
+    """
+
+    def __init__(self, block_ms: int, base_ms: int = 250, min_ms: int = 120, max_ms: int = 900,
+                 decay_db: Tuple[float, float] = (1.0, 7.0), nominal_rate: float = 5.5,
+                 stream_factory: Optional[Callable[[], object]] = None,
+                 completion: Optional[Callable[[str], Optional[float]]] = japanese_completion):
+        self.block_ms = block_ms
+        self.base_ms = base_ms
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.decay_db = decay_db
+        self.nominal_rate = nominal_rate
+        self.stream_factory = stream_factory
+        self.completion = completion
+        self.stream = None
+        self.last_ms: float = float(base_ms)  # 直近に決めたタイムアウト（ログ・評価用）
+        self.reset()
+
+    def reset(self) -> None:
+        self._db: List[float] = []           # この発話の有声ブロックのエネルギー（dB）
+        self._tail: deque = deque(maxlen=3)  # 直近の有声ブロック
+        self._limit: Optional[int] = None    # 無音区間ごとにキャッシュ
+        self.stream = None
+
+    # ---- VADRecorder から ----
+    def start(self, buffered: List[np.ndarray]) -> None:
+        """発話開始（in_speech になった）。ストリームがあれば溜まっている分を流す"""
+        if self.stream_factory is None:
+            return
+        try:
+            self.stream = self.stream_factory()
+            for b in buffered:
+                self._accept(b)
+        except Exception as e:
+            print(f"[Endpoint] stream disabled: {e}")
+            self.stream_factory = self.stream = None
+
+    def observe(self, block: np.ndarray, rms: float, voice: bool) -> None:
+        if voice:
+            db = 20.0 * math.log10(max(rms, 1e-6))
+            self._db.append(db)
+            self._tail.append(db)
+            self._limit = None  # 無音が途切れたので次の無音で決め直す
+        if self.stream is not None:
+            self._accept(block)
+
+    def limit_blocks(self) -> int:
+        if self._limit is None or self.stream is not None:
+            ms = self.timeout_ms()
+            self.last_ms = ms
+            self._limit = max(1, int(round(ms / self.block_ms)))
+        return self._limit
+
+    # ---- 手がかり ----
+    def _accept(self, block: np.ndarray) -> None:
+        pcm = (np.clip(block, -1.0, 1.0) * 32767.0).astype("<i2")
+        self.stream.accept(memoryview(pcm).cast("B"))
+
+    def decay_factor(self) -> float:
+        if len(self._db) < 5 or not self._tail:
+            return 1.0
+        drop = float(np.median(self._db)) - float(np.mean(self._tail))
+        return float(np.interp(drop, self.decay_db, [1.8, 0.5]))
+
+    def speech_rate(self) -> Optional[float]:
+        """音節レート（ピーク / 秒）。有声 0.5 秒未満は None"""
+        n = len(self._db)
+        if n * self.block_ms < 500:
+            return None
+        e = np.convolve(np.asarray(self._db), np.ones(3) / 3.0, mode="same")
+        mid = e[1:-1]
+        peaks = np.flatnonzero((mid > e[:-2]) & (mid >= e[2:])) + 1
+        # 谷から 2 dB 以上立ち上がっているピークだけ数える
+        count = 0
+        for p in peaks:
+            lo = e[max(0, p - 5):p + 6].min()
+            if e[p] - lo >= 2.0:
+                count += 1
+        return count / (n * self.block_ms / 1000.0)
+
+    def rate_factor(self) -> float:
+        r = self.speech_rate()
+        if not r:
+            return 1.0
+        return float(np.clip(self.nominal_rate / r, 0.75, 1.33))
+
+    def completion_factor(self) -> float:
+        if self.stream is None or self.completion is None:
+            return 1.0
+        try:
+            p = self.completion(self.stream.partial())
+        except Exception as e:
+            print(f"[Endpoint] partial failed: {e}")
+            return 1.0
+        return 1.0 if p is None else 1.5 - float(p)
+
+    def timeout_ms(self) -> float:
+        ms = self.base_ms * self.decay_factor() * self.rate_factor() * self.completion_factor()
+        return float(min(self.max_ms, max(self.min_ms, ms)))
+
+def build_endpointer(cfg, stream_factory=None, completion=None) -> AdaptiveEndpointer | None:
+    """Config から（endpoint="fixed" なら None = 従来の固定タイムアウト）"""
+    if getattr(cfg, "endpoint", "fixed") != "adaptive":
+        return None
+    kwargs = {}
+    if completion is not None:
+        kwargs["completion"] = completion
+    return AdaptiveEndpointer(cfg.block_ms, base_ms=cfg.min_silence_ms, min_ms=cfg.endpoint_min_ms,
+                              max_ms=cfg.endpoint_max_ms, stream_factory=stream_factory, **kwargs)
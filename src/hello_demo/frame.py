@@ -0,0 +1,190 @@
+"""
+パイプライン内で音声を受け渡すための軽量フレーム型。
+
+float32 配列 → PCM16 → WAV bytes → (wave で再パース) → PCM と行き来していたのを、
+「サンプルレート・形式・チャンネル数＋バッファ（memoryview）」の 1 つにまとめる。
+from_wav はヘッダを読んで data チャンクを指す memoryview を作るだけでコピーしない。
+"""
+from __future__ import annotations
+import struct
+from dataclasses import dataclass
+import numpy as np
+
+FORMATS = {"pcm16": np.dtype("<i2"), "float32": np.dtype("<f4")}
+
+@dataclass(frozen=True)
+class AudioFrame:
+    data: memoryview          # サンプル列（インタリーブ、リトルエンディアン）
+    sample_rate: int
+    format: str = "pcm16"     # "pcm16" | "float32"
+    channels: int = 1
+
+    def __post_init__(self):
+        if self.format not in FORMATS:
+            raise ValueError(f"unsupported format: {self.format}")
+        if not isinstance(self.data, memoryview):
+            object.__setattr__(self, "data", memoryview(self.data))
+        if self.data.format != "B" or self.data.ndim != 1:
+            object.__setattr__(self, "data", self.data.cast("B"))
+
+    # ---- 生成 ----
+    @classmethod
+    def from_float(cls, x: np.ndarray, sample_rate: int) -> "AudioFrame":
+        """float32 配列をそのまま包む（float32・連続ならコピーなし）"""
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        return cls(memoryview(x).cast("B"), sample_rate, "float32", x.shape[1] if x.ndim == 2 else 1)
+
+    @classmethod
+    def from_pcm16(cls, pcm, sample_rate: int, channels: int = 1) -> "AudioFrame":
+        mv = memoryview(pcm).cast("B")
+        n = len(mv) // (2 * channels) * (2 * channels)
+        return cls(mv[:n], sample_rate, "pcm16", channels)
+
+    @classmethod
+    def from_wav(cls, wav) -> "AudioFrame":
+        """RIFF/WAVE（PCM16 / IEEE float32）のヘッダだけ読み、data チャンクを参照する"""
+        mv = memoryview(wav).cast("B")
+        if len(mv) < 12 or mv[:4] != b"RIFF" or mv[8:12] != b"WAVE":
+            raise ValueError("not a RIFF/WAVE buffer")
+        fmt = None
+        pos = 12
+        while pos + 8 <= len(mv):
+            cid = bytes(mv[pos:pos + 4])
+            size = struct.unpack_from("<I", mv, pos + 4)[0]
+            body = pos + 8
+            if cid == b"fmt ":
+                tag, ch, rate, _, _, bits = struct.unpack_from("<HHIIHH", mv, body)
+                if tag == 0xFFFE and size >= 26:  # WAVE_FORMAT_EXTENSIBLE: サブフォーマット GUID 先頭 2 バイト
+                    tag = struct.unpack_from("<H", mv, body + 24)[0]
+                fmt = (tag, ch, rate, bits)
+            elif cid == b"data":
+                if fmt is None:
+                    raise ValueError("data chunk before fmt chunk")
+                tag, ch, rate, bits = fmt
+                if (tag, bits) == (1, 16):
+                    kind = "pcm16"
+                elif (tag, bits) == (3, 32):
+                    kind = "float32"
+                else:
+                    raise ValueError(f"unsupported WAV format tag={tag} bits={bits}")
+                # ストリーム出力の WAV はサイズ欄が 0 / 0xFFFFFFFF のことがあるので実長で切る
+                end = len(mv) if size in (0, 0xFFFFFFFF) else min(len(mv), body + size)
+                block = ch * bits // 8
+                end = body + (end - body) // block * block
+                return cls(mv[body:end], rate, kind, ch)
+            pos = body + size + (size & 1)
+        raise ValueError("no data chunk in WAV")
+
+    @classmethod
+    def from_aiff(cls, aiff) -> "AudioFrame":
+        """
+        AIFF / AIFF-C（macOS の音声合成の出力）を読む。ビッグエンディアンなので
+        from_wav と違い変換コピーを作る。整数 8/16/24/32 bit と fl32 に対応。
+        """
+        mv = memoryview(aiff).cast("B")
+        if len(mv) < 12 or mv[:4] != b"FORM" or bytes(mv[8:12]) not in (b"AIFF", b"AIFC"):
+            raise ValueError("not an AIFF buffer")
+        comm = None
+        pos = 12
+        while pos + 8 <= len(mv):
+            cid = bytes(mv[pos:pos + 4])
+            size = struct.unpack_from(">I", mv, pos + 4)[0]
+            body = pos + 8
+            if cid == b"COMM":
+                ch, frames, bits = struct.unpack_from(">hIh", mv, body)
+                exp, mant = struct.unpack_from(">HQ", mv, body + 8)  # 80-bit 拡張精度のレート
+                rate = int(round(mant * 2.0 ** ((exp & 0x7FFF) - 16383 - 63)))
+                comp = bytes(mv[body + 18:body + 22]) if size >= 22 else b"NONE"
+                comm = (ch, frames, bits, rate, comp)
+            elif cid == b"SSND":
+                if comm is None:
+                    raise ValueError("SSND chunk before COMM chunk")
+                ch, frames, bits, rate, comp = comm
+                start = body + 8 + struct.unpack_from(">I", mv, body)[0]
+                raw = mv[start:min(len(mv), body + size)]
+                if comp in (b"fl32", b"FL32"):
+                    a = np.frombuffer(raw, dtype=">f4", count=len(raw) // 4)
+                    return cls.from_float(a.astype(np.float32).reshape(-1, ch) if ch > 1 else a.astype(np.float32), rate)
+                if comp not in (b"NONE", b"twos", b"sowt") or bits not in (8, 16, 24, 32):
+                    raise ValueError(f"unsupported AIFF compression={comp!r} bits={bits}")
+                width = (bits + 7) // 8
+                n = len(raw) // width
+                b = np.frombuffer(raw, dtype=np.uint8, count=n * width).reshape(n, width)
+                if comp != b"sowt":
+                    b = b[:, ::-1]  # リトルエンディアンに並べ替える
+                # 上位 2 バイトを取り出して PCM16 にする（8 bit は 8 ビット左へ）
+                if width == 1:
+                    pcm = b[:, 0].astype(np.int8).astype("<i2") << 8
+                else:
+                    pcm = np.ascontiguousarray(b[:, width - 2:]).view("<i2").reshape(-1)
+                pcm = np.ascontiguousarray(pcm[:len(pcm) // ch * ch], dtype="<i2")
+                return cls.from_pcm16(pcm, rate, ch)
+            pos = body + size + (size & 1)
+        raise ValueError("no SSND chunk in AIFF")
+
+    @classmethod
+    def from_bytes(cls, data, sample_rate: int) -> "AudioFrame":
+        """RIFF なら WAV、FORM なら AIFF として、そうでなければ裸の PCM16 mono として扱う"""
+        if len(data) >= 12 and bytes(data[:4]) == b"RIFF":
+            return cls.from_wav(data)
+        if len(data) >= 12 and bytes(data[:4]) == b"FORM":
+            return cls.from_aiff(data)
+        return cls.from_pcm16(data, sample_rate)
+
+    # ---- 参照・変換 ----
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    @property
+    def num_frames(self) -> int:
+        return len(self.data) // (FORMATS[self.format].itemsize * self.channels)
+
+    @property
+    def duration(self) -> float:
+        return self.num_frames / float(self.sample_rate)
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def as_array(self) -> np.ndarray:
+        """バッファを共有する配列ビュー（mono は 1 次元、多チャンネルは (n, ch)）"""
+        a = np.frombuffer(self.data, dtype=FORMATS[self.format])
+        return a.reshape(-1, self.channels) if self.channels > 1 else a
+
+    def to_float(self) -> np.ndarray:
+        """float32 mono（先頭チャンネル）。float32 mono ならビューを返す"""
+        a = self.as_array()
+        if a.ndim == 2:
+            a = a[:, 0]
+        if self.format == "float32":
+            return a
+        return a.astype(np.float32) / 32767.0
+
+    def mono(self) -> "AudioFrame":
+        if self.channels == 1:
+            return self
+        a = np.ascontiguousarray(self.as_array()[:, 0])
+        return AudioFrame(memoryview(a).cast("B"), self.sample_rate, self.format, 1)
+
+    def pcm16(self) -> "AudioFrame":
+        """PCM16 のフレーム。すでに PCM16 なら自分自身（コピーなし）"""
+        if self.format == "pcm16":
+            return self
+        a = (np.clip(self.as_array(), -1.0, 1.0) * 32767.0).astype("<i2")
+        return AudioFrame(memoryview(a).cast("B"), self.sample_rate, "pcm16", self.channels)
+
+    def resampled(self, sample_rate: int) -> "AudioFrame":
+        """mono float32 でレート変換（同じレートなら自分自身）"""
+        if sample_rate == self.sample_rate:
+            return self
+        from .resample import resample
+        return AudioFrame.from_float(resample(self.to_float(), self.sample_rate, sample_rate), sample_rate)
+
+    def to_wav(self) -> bytes:
+        """PCM16 の RIFF/WAVE bytes（WAV を要求する API 向けの出口）"""
+        f = self.pcm16()
+        block = 2 * f.channels
+        head = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + f.nbytes, b"WAVE", b"fmt ", 16, 1,
+                           f.channels, f.sample_rate, f.sample_rate * block, block, 16, b"data", f.nbytes)
+        return b"".join((head, f.data))
@@ -6,7 +6,8 @@ from .ui_tk import SimpleUI
 def main():
     cfg = parse_args()
     tts_client = build_tts(cfg.tts)
-    stt_client = build_stt(cfg.stt) if cfg.mode == "keyword" else None
+    stt_client = (build_stt(cfg.stt, workers=cfg.stt_workers, timeout=cfg.stt_timeout)
+                  if cfg.mode == "keyword" else None)
     ui = SimpleUI("Hello Demo UI")
     def on_user(text: str): ui.enqueue("user", text or "")
     def on_system(text: str): ui.enqueue("system", text or "")
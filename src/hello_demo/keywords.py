@@ -0,0 +1,145 @@
+from __future__ import annotations
+import re, unicodedata
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+try:
+    import pykakasi  # type: ignore  # 任意: 漢字 -> かな読み
+    _kks = pykakasi.kakasi()
+except Exception:
+    _kks = None
+
+def normalize(s: str | None) -> str:
+    """NFKC + 空白除去 + 小文字 + カタカナ→ひらがな"""
+    if not s:
+        return ""
+    s = unicodedata.normalize("NFKC", s)
+    s = "".join(s.split()).lower()
+    return "".join(chr(ord(c) - 0x60) if "ァ" <= c <= "ヶ" else c for c in s)
+
+def reading(s: str | None) -> str:
+    """かな読み（pykakasi が無ければ normalize と同じ）"""
+    n = normalize(s)
+    if not n or _kks is None:
+        return n
+    try:
+        return normalize("".join(tok.get("hira", "") for tok in _kks.convert(n)))
+    except Exception:
+        return n
+
+def _grams(s: str, n: int) -> set:
+    if len(s) < n:
+        return {s} if s else set()
+    return {s[i:i + n] for i in range(len(s) - n + 1)}
+
+def substring_distance(pat: str, text: str, limit: int) -> int:
+    """pat と text 中の任意部分文字列との最小編集距離（limit を超えたら limit+1）"""
+    m = len(pat)
+    prev = list(range(m + 1))  # text の空接頭辞に対する列（どこからでも始められる）
+    best = prev[m]
+    for ch in text:
+        cur = [0] * (m + 1)
+        for i in range(1, m + 1):
+            cost = 0 if pat[i - 1] == ch else 1
+            cur[i] = min(prev[i - 1] + cost, prev[i] + 1, cur[i - 1] + 1)
+        best = min(best, cur[m])
+        if best == 0:
+            return 0
+        prev = cur
+    return best if best <= limit else limit + 1
+
+@dataclass
+class KeywordMatch:
+    entry: Dict[str, Any]
+    index: int            # keywords.json 内の位置
+    pattern: str          # マッチしたパターン（元の表記）
+    distance: int
+    confidence: float     # 1 - distance/len(パターン)
+
+class KeywordMatcher:
+    """
+    keywords.json のエントリを n-gram 転置インデックスで引く近似マッチャ。
+    各パターンの表記と読み（かな）を索引に入れ、transcript の n-gram を共有する
+    候補だけを編集距離で検証する（q-gram 補題で取りこぼしなし）。
+    許容距離は floor(len*max_ratio) と max_edits の小さい方。完全一致はこれまで通り
+    先頭のエントリ優先、あいまい一致は confidence の高いもの優先。
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]], max_ratio: float = 0.2,
+                 max_edits: int = 2, ngram: int = 2):
+        self.entries = entries
+        self.max_ratio = max_ratio
+        self.max_edits = max_edits
+        self.n = ngram
+        self._regex: List[tuple] = []
+        self._keys: List[tuple] = []       # (entry_idx, 元パターン, キー文字列, 許容距離)
+        self._need: List[int] = []         # 候補になるのに必要な共有 n-gram 数
+        self._index: Dict[str, List[int]] = defaultdict(list)
+        self._always: List[int] = []       # 補題で絞れない短いキー
+        for ei, entry in enumerate(entries):
+            patterns = entry.get("match") or entry.get("keywords") or []
+            if entry.get("regex"):
+                for p in patterns:
+                    try:
+                        self._regex.append((ei, str(p), re.compile(p)))
+                    except re.error as e:
+                        print(f"[Keywords] Bad regex '{p}': {e}")
+                continue
+            for p in patterns:
+                for key in {normalize(str(p)), reading(str(p))}:
+                    if key:
+                        self._add_key(ei, str(p), key)
+
+    def _allowed(self, key: str) -> int:
+        return min(self.max_edits, int(len(key) * self.max_ratio))
+
+    def _add_key(self, ei: int, pattern: str, key: str) -> None:
+        kid = len(self._keys)
+        k = self._allowed(key)
+        grams = _grams(key, self.n)
+        need = len(grams) - k * self.n
+        self._keys.append((ei, pattern, key, k))
+        self._need.append(need)
+        if need <= 0 or len(key) < self.n:
+            # n 文字未満のキーは transcript の n-gram と共有できないので毎回 key in q で見る
+            self._always.append(kid)
+            return
+        for g in grams:
+            self._index[g].append(kid)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def candidates(self, q: str) -> List[int]:
+        counts: Dict[int, int] = defaultdict(int)
+        for g in _grams(q, self.n):
+            for kid in self._index.get(g, ()):
+                counts[kid] += 1
+        return [kid for kid, c in counts.items() if c >= self._need[kid]] + self._always
+
+    def match(self, text: str | None, log: bool = True) -> Optional[KeywordMatch]:
+        best: Optional[KeywordMatch] = None
+
+        def better(m: KeywordMatch) -> bool:
+            return best is None or (-m.confidence, m.index) < (-best.confidence, best.index)
+
+        for ei, p, rx in self._regex:
+            if (best is None or ei < best.index) and rx.search(text or ""):
+                best = KeywordMatch(self.entries[ei], ei, p, 0, 1.0)
+        queries = {normalize(text), reading(text)} - {""}
+        for q in queries:
+            for kid in self.candidates(q):
+                ei, p, key, k = self._keys[kid]
+                if best is not None and best.confidence == 1.0 and ei > best.index:
+                    continue
+                d = 0 if key in q else (substring_distance(key, q, k) if k else 1)
+                if d > k:
+                    continue
+                m = KeywordMatch(self.entries[ei], ei, p, d, 1.0 - d / len(key))
+                if better(m):
+                    best = m
+        if best is not None and log:
+            print(f"[Keywords] entry#{best.index} pattern={best.pattern!r} "
+                  f"dist={best.distance} conf={best.confidence:.2f}")
+        return best
@@ -0,0 +1,182 @@
+"""
+STT の前に置く軽量キーワードスポッタ（MFCC ＋ テンプレート DTW）。
+
+keywords.json の各エントリに "examples"（例示 WAV のパス、keywords.json からの相対可）を書くと
+それをテンプレートにし、発話の中で最もよく一致する区間までの距離（subsequence DTW）を出す。
+
+  { "match": ["紹介"], "say": "おー！", "examples": ["kws/shoukai_1.wav", "kws/shoukai_2.wav"] }
+
+距離が reject より大きければ「どのキーワードでもない」として STT を省き、
+accept 以下なら STT を待たずにそのエントリで応答する。間はこれまで通り STT で判定する。
+"""
+from __future__ import annotations
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from .frame import AudioFrame
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(rate: int, n_fft: int, n_mels: int, fmin: float, fmax: float) -> np.ndarray:
+    """(n_mels, n_fft//2+1) の三角フィルタ"""
+    mel = lambda f: 2595.0 * np.log10(1.0 + f / 700.0)
+    hz = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+    edges = hz(np.linspace(mel(fmin), mel(fmax), n_mels + 2))
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / rate)
+    lo, mid, hi = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    up = (freqs[None, :] - lo) / (mid - lo)
+    down = (hi - freqs[None, :]) / (hi - mid)
+    return np.maximum(0.0, np.minimum(up, down)).astype(np.float32)
+
+@lru_cache(maxsize=8)
+def _dct_matrix(n_mels: int, n_mfcc: int) -> np.ndarray:
+    """DCT-II（直交正規化）の先頭 n_mfcc 行"""
+    k = np.arange(n_mfcc)[:, None]
+    n = np.arange(n_mels)[None, :]
+    m = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    m[0] /= np.sqrt(2.0)
+    return m.astype(np.float32)
+
+def mfcc(x: np.ndarray, rate: int, n_mfcc: int = 13, n_mels: int = 26,
+         win_ms: float = 25.0, hop_ms: float = 10.0, preemph: float = 0.97, cmn: bool = True) -> np.ndarray:
+    """(frames, n_mfcc-1) の MFCC。c0（音量）は捨てる。cmn=True なら平均を引く（マイク特性の除去）"""
+    x = np.asarray(x, dtype=np.float32)
+    win = int(rate * win_ms / 1000)
+    hop = int(rate * hop_ms / 1000)
+    if len(x) < win:
+        return np.zeros((0, n_mfcc - 1), dtype=np.float32)
+    x = np.append(x[0], x[1:] - preemph * x[:-1])
+    frames = sliding_window_view(x, win)[::hop] * np.hamming(win).astype(np.float32)
+    n_fft = 1 << (win - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft, axis=1)) ** 2
+    fb = _mel_filterbank(rate, n_fft, n_mels, 20.0, rate / 2.0)
+    logmel = np.log(power @ fb.T + 1e-10)
+    c = logmel @ _dct_matrix(n_mels, n_mfcc).T
+    c = c[:, 1:]
+    return (c - c.mean(axis=0) if cmn else c).astype(np.float32)
+
+def voiced(x: np.ndarray, rate: int, hop_ms: float = 10.0, win_ms: float = 25.0,
+           floor_db: float = 35.0, snr_db: float = 6.0) -> np.ndarray:
+    """
+    前後の無音・背景雑音を落とすマスク。ピークから floor_db 以内かつ
+    雑音床（下位 10% のフレームエネルギー）より snr_db 以上大きい最初〜最後のフレームを残す。
+    """
+    win = int(rate * win_ms / 1000)
+    hop = int(rate * hop_ms / 1000)
+    if len(x) < win:
+        return np.zeros(0, dtype=bool)
+    e = 10 * np.log10(np.mean(sliding_window_view(x, win)[::hop] ** 2, axis=1) + 1e-12)
+    on = np.flatnonzero(e >= max(e.max() - floor_db, np.percentile(e, 10) + snr_db))
+    if not len(on):
+        on = np.arange(len(e))
+    mask = np.zeros(len(e), dtype=bool)
+    mask[on[0]:on[-1] + 1] = True
+    return mask
+
+def _unit(f: np.ndarray) -> np.ndarray:
+    return f / (np.linalg.norm(f, axis=1, keepdims=True) + 1e-8)
+
+def subsequence_dtw(templates: np.ndarray, lengths: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    各テンプレート（単位ベクトル列）が query のどこかに現れるときの最小平均コサイン距離。
+    templates は (T, m_max, d) にゼロ詰めしたもの、lengths は各テンプレートの実フレーム数。
+
+    始点・終点は query 上で自由。歩幅は (1,1) (1,2) (2,1) の Itakura 型で、
+    (2,1) で飛ばしたテンプレートのフレームも同じ query フレームとの距離で払う
+    （払わないと半分のフレームだけで一致でき、テンプレート長で割った平均が甘くなる）。
+    各行が 1 つ前・2 つ前の行だけに依存するので「全テンプレートの i 行目」をまとめて計算できる。
+    傾きが 1/2〜2 に制限されるので query がテンプレートの半分より短いと inf。
+    """
+    T, m_max, _ = templates.shape
+    n = len(query)
+    out = np.full(T, np.inf)
+    if T == 0 or n == 0:
+        return out
+    cost = 1.0 - templates @ query.T  # (T, m_max, n) コサイン距離
+    inf = np.float32(np.inf)
+    prev2 = np.full((T, n), inf, dtype=np.float32)
+    prev = cost[:, 0].copy()  # 始点自由
+    best = np.empty((T, n), dtype=np.float32)
+    for i in range(1, int(lengths.max())):
+        best[:, 0] = inf
+        best[:, 1:] = np.minimum(prev[:, :-1],                                # (1,1)
+                                 prev2[:, :-1] + cost[:, i - 1, 1:])          # (2,1): 飛ばす i-1 行目も払う
+        best[:, 2:] = np.minimum(best[:, 2:], prev[:, :-2])                   # (1,2): query を 1 フレーム飛ばす
+        prev2, prev = prev, cost[:, i] + best
+        done = lengths == i + 1
+        if done.any():
+            out[done] = prev[done].min(axis=1)
+    out[lengths == 1] = cost[lengths == 1, 0].min(axis=1)
+    return out / np.maximum(lengths, 1)
+
+@dataclass
+class KwsResult:
+    entry: Optional[Dict[str, Any]]
+    index: int             # keyword_map 上の位置（-1 = テンプレートなし）
+    score: float           # 平均コサイン距離（小さいほど一致）
+    example: str = ""
+
+class KeywordSpotter:
+    """
+    keywords.json の "examples" をテンプレートにした MFCC-DTW スポッタ。
+        ks = KeywordSpotter(entries, base_dir=os.path.dirname(keywords_file))
+        r = ks.spot(utter_float32, 16000)   # -> KwsResult
+    """
+
+    def __init__(self, entries: Sequence[Dict[str, Any]], base_dir: str = ".", rate: int = 16000):
+        self.entries = list(entries)
+        self.rate = rate
+        self.templates: List[Tuple[int, str, np.ndarray]] = []  # (entry index, path, 単位化 MFCC)
+        missing = 0
+        for ei, e in enumerate(self.entries):
+            paths = e.get("examples") or []
+            if isinstance(paths, str):
+                paths = [paths]
+            if not paths:
+                missing += 1
+            for p in paths:
+                path = p if os.path.isabs(p) else os.path.join(base_dir, p)
+                try:
+                    with open(path, "rb") as f:
+                        x = AudioFrame.from_wav(f.read()).resampled(rate).to_float()
+                except Exception as ex:
+                    print(f"[KWS] cannot load example {path}: {ex}")
+                    continue
+                feat = self.features(x)
+                if len(feat):
+                    self.templates.append((ei, p, _unit(feat)))
+        # DTW をテンプレート横断でまとめて回すためにゼロ詰めで積んでおく
+        self._lengths = np.array([len(t) for _, _, t in self.templates], dtype=np.int64)
+        dim = self.templates[0][2].shape[1] if self.templates else 0
+        self._stack = np.zeros((len(self.templates), int(self._lengths.max(initial=0)), dim), dtype=np.float32)
+        for k, (_, _, t) in enumerate(self.templates):
+            self._stack[k, :len(t)] = t
+        # テンプレートのないエントリがあると「どれでもない」とは言い切れない
+        self.complete = bool(self.templates) and missing == 0
+        print(f"[KWS] {len(self.templates)} templates for {len(self.entries) - missing}/{len(self.entries)} entries")
+
+    def features(self, x: np.ndarray) -> np.ndarray:
+        """前後の無音を落とした区間の MFCC（CMN はその区間の平均で）"""
+        f = mfcc(x, self.rate, cmn=False)
+        if len(f):
+            f = f[voiced(x, self.rate)[:len(f)]]
+            f = f - f.mean(axis=0)
+        return f
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def spot(self, x: np.ndarray, sample_rate: int | None = None) -> KwsResult:
+        if sample_rate and sample_rate != self.rate:
+            x = AudioFrame.from_float(x, sample_rate).resampled(self.rate).to_float()
+        q = _unit(self.features(x))
+        if not self.templates or not len(q):
+            return KwsResult(None, -1, float("inf"))
+        scores = subsequence_dtw(self._stack, self._lengths, q)
+        k = int(np.argmin(scores))
+        if not np.isfinite(scores[k]):
+            return KwsResult(None, -1, float("inf"))
+        ei, path, _ = self.templates[k]
+        return KwsResult(self.entries[ei], ei, float(scores[k]), path)
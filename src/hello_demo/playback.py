@@ -1,8 +1,13 @@
 from __future__ import annotations
-import os, platform, io, wave
+import os, platform
+from .frame import AudioFrame
 
 class WavPlayback:
-    def __init__(self):
+    def __init__(self, output_rate: int | None = None, device=None):
+        # output_rate: 出力デバイスのレート（None=デバイスのネイティブを問い合わせ、0=変換しない）
+        self.output_rate = output_rate
+        self.device = device
+        self.reference = None  # PlaybackReference（エコーキャンセラ用、任意）
         self.is_windows = platform.system() == 'Windows'
         if self.is_windows:
             import winsound  # type: ignore
@@ -18,6 +23,9 @@ class WavPlayback:
         """既存：ファイルパスから再生"""
         if not os.path.exists(path):
             raise FileNotFoundError(path)
+        if self.reference is not None:
+            with open(path, "rb") as f:
+                self._push_reference(AudioFrame.from_wav(f.read()))
         if self.is_windows:
             self._winsound.PlaySound(path, self._winsound.SND_FILENAME)
         else:
@@ -27,21 +35,46 @@ class WavPlayback:
             play_obj = wave_obj.play()
             play_obj.wait_done()
 
+    def _target_rate(self) -> int:
+        if self.output_rate is None:
+            from .audio_io import device_rate
+            self.output_rate = device_rate(self.device, "output") or 0
+            if self.output_rate:
+                print(f"[Playback] output device rate {self.output_rate} Hz")
+        return self.output_rate
+
+    def _match_device_rate(self, frame: AudioFrame) -> AudioFrame:
+        """フレームのレートが出力デバイスと違えばリサンプルする（同じならそのまま）"""
+        target = self._target_rate()
+        if not target or frame.sample_rate == target:
+            return frame
+        return frame.resampled(target)
+
+    def _push_reference(self, frame: AudioFrame) -> None:
+        """これから鳴らす信号をエコーキャンセラの参照として登録"""
+        try:
+            self.reference.push(frame.to_float(), frame.sample_rate)
+        except Exception as e:
+            print(f"[Playback] reference push failed: {e}")
+
     def play_bytes(self, wav_bytes: bytes) -> None:
-        """新規：WAV(PCM)のバイト列を直接再生"""
+        """WAV(PCM)のバイト列を直接再生（play_frame へのアダプタ）"""
         if not wav_bytes:
             return
+        self.play_frame(AudioFrame.from_wav(wav_bytes))
+
+    def play_frame(self, frame: AudioFrame | None) -> None:
+        """AudioFrame を再生（PCM を再パースせずにそのまま出力へ渡す）"""
+        if frame is None or not frame.nbytes:
+            return
+        frame = self._match_device_rate(frame).pcm16()
+        if self.reference is not None:
+            self._push_reference(frame)
         if self.is_windows:
             # winsound はメモリ再生に対応（RIFF/WAVEヘッダ必須）
-            self._winsound.PlaySound(wav_bytes, self._winsound.SND_MEMORY)
+            self._winsound.PlaySound(frame.to_wav(), self._winsound.SND_MEMORY)
         else:
             if self._sa is None:
                 raise RuntimeError("simpleaudio not available")
-            # WAVヘッダからパラメタとフレームを取り出し、play_bufferで再生
-            with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
-                n_channels = wf.getnchannels()
-                sampwidth = wf.getsampwidth()
-                framerate = wf.getframerate()
-                frames = wf.readframes(wf.getnframes())
-            play_obj = self._sa.play_buffer(frames, n_channels, sampwidth, framerate)
+            play_obj = self._sa.play_buffer(frame.data, frame.channels, 2, frame.sample_rate)
             play_obj.wait_done()
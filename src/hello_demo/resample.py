@@ -0,0 +1,78 @@
+from __future__ import annotations
+from math import gcd
+import numpy as np
+
+class PolyphaseResampler:
+    """
+    有理比 up/down のポリフェーズ FIR リサンプラ（ブロック間で状態を保持）。
+    キャプチャ（例: 48k → 16k）と TTS 出力（例: 24k → 48k）の両方で使う。
+    process() は任意長のブロックを受け取り、対応する出力サンプルだけを返す。
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 32, beta: float = 8.0,
+                 cutoff: float = 0.9):
+        if in_rate <= 0 or out_rate <= 0:
+            raise ValueError(f"bad rates: {in_rate} -> {out_rate}")
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        g = gcd(self.in_rate, self.out_rate)
+        self.up = self.out_rate // g
+        self.down = self.in_rate // g
+        self.passthrough = (self.up == self.down)
+
+        # プロトタイプ低域通過フィルタ（up 倍レート上で設計、Kaiser 窓付き sinc）
+        # 長さは低い方のレートの 1 周期あたり taps_per_phase（間引き 48k -> 16k なら 96 タップ）。
+        # 中心を down の倍数に置き、出力側の群遅延を整数サンプルにする（resample() で半端にずれない）。
+        # 遮断は低い方のナイキストの cutoff 倍（ちょうどナイキストだと遷移帯の分だけ折り返す）。
+        m = max(self.up, self.down)
+        c = -(-(int(taps_per_phase) * m - 1) // (2 * self.down)) * self.down
+        L = -(-(2 * c + 1) // self.up) * self.up
+        self.taps = L // self.up  # 1 相あたりのタップ数（入力サンプル数）
+        fc = 0.5 * cutoff / m
+        n = np.arange(2 * c + 1) - c
+        h = np.zeros(L)
+        h[:2 * c + 1] = 2.0 * fc * np.sinc(2.0 * fc * n) * np.kaiser(2 * c + 1, beta)
+        h *= self.up / h.sum()  # 補間後の DC ゲイン = 1
+        # h_poly[p, k] = h[p + k*up] を k 逆順で保持（sliding window と内積を取るため）
+        self._h = np.ascontiguousarray(h.reshape(self.taps, self.up).T[:, ::-1], dtype=np.float32)
+        # 出力側で見た群遅延（サンプル、整数）
+        self.delay = c // self.down
+        self.reset()
+
+    def reset(self) -> None:
+        self._hist = np.zeros(self.taps - 1, dtype=np.float32)
+        self._j = 0  # 次の出力位置（up 倍レート単位、現ブロック先頭基準）
+
+    def process(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[:, 0]
+        if self.passthrough:
+            return x
+        span = len(x) * self.up
+        buf = np.concatenate([self._hist, x])
+        if self._j >= span:
+            # このブロックからは出力なし（極端に短いブロック）
+            self._j -= span
+            self._hist = buf[len(buf) - len(self._hist):].copy()
+            return np.zeros(0, dtype=np.float32)
+        j = np.arange(self._j, span, self.down)
+        idx = j // self.up  # 現ブロック内の最新入力サンプル位置
+        ph = j % self.up
+        win = np.lib.stride_tricks.sliding_window_view(buf, self.taps)[idx]
+        y = np.einsum("ij,ij->i", win, self._h[ph]).astype(np.float32, copy=False)
+        self._j = int(j[-1]) + self.down - span
+        self._hist = buf[len(buf) - len(self._hist):].copy()
+        return y
+
+def resample(x: np.ndarray, in_rate: int, out_rate: int, taps_per_phase: int = 32) -> np.ndarray:
+    """一括変換（群遅延を補正して長さ ≒ len(x)*out/in を返す）"""
+    x = np.asarray(x, dtype=np.float32)
+    if in_rate == out_rate:
+        return x
+    r = PolyphaseResampler(in_rate, out_rate, taps_per_phase=taps_per_phase)
+    d = r.delay
+    pad = int(np.ceil((d + 1) * r.down / r.up)) + r.taps
+    y = r.process(np.concatenate([x, np.zeros(pad, dtype=np.float32)]))
+    n_out = int(np.ceil(len(x) * r.up / r.down))
+    return y[d:d + n_out]
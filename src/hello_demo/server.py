@@ -0,0 +1,391 @@
+"""
+ローカル HTTP / WebSocket サービス（HelloApp のマッチング・TTS をそのまま使う）。
+
+  python -m hello_demo.server --host 127.0.0.1 --port 8765 --stt vosk --keywords-file keywords.json
+
+  GET  /health              -> {"ok": true, "clients": n}
+  POST /respond?rate=16000  body: WAV か 16-bit mono PCM（rate で指定）
+                            -> {"transcript": ..., "say": ..., "wav_b64": ...}
+  GET  /stream?rate=48000   WebSocket。クライアント -> バイナリ = 16-bit mono PCM
+       サーバ -> {"type": "vad", "event": "start"} / {"type": "vad", "event": "end", "duration": s}
+                 {"type": "transcript", "text": ...}
+                 {"type": "response", "say": ...}（say があれば直後にバイナリで WAV）
+                 {"type": "error", "message": ...}（その発話の応答に失敗。セッションは続く）
+       クライアントが {"type": "eos"} を送ると話し途中の分も処理し、{"type": "done"} を返す
+
+STT/TTS はスレッドプールで実行し、イベントループ（多数の接続）を止めない。
+プロセス並列にしたい場合は --stt-workers を併用する。
+"""
+from __future__ import annotations
+import asyncio, base64, hashlib, json, struct, sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from .app import HelloApp
+from .audio_io import VADRecorder, pcm16_to_float
+from .endpoint import build_endpointer
+from .frame import AudioFrame
+from .resample import PolyphaseResampler
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_BODY = 20 * 1024 * 1024
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+class WebSocket:
+    """最小限の RFC 6455 サーバ側実装（断片化・ping/pong・close 対応）"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_message: int = MAX_BODY):
+        self.reader = reader
+        self.writer = writer
+        self.max_message = max_message
+        self._send_lock = asyncio.Lock()
+        self.closed = False
+
+    @staticmethod
+    def _unmask(data: bytes, mask: bytes) -> bytes:
+        a = np.frombuffer(data, dtype=np.uint8)
+        m = np.frombuffer(mask * (len(data) // 4 + 1), dtype=np.uint8)[:len(data)]
+        return (a ^ m).tobytes()
+
+    async def _frame(self) -> Tuple[bool, int, bytes]:
+        h = await self.reader.readexactly(2)
+        fin, op = bool(h[0] & 0x80), h[0] & 0x0F
+        n = h[1] & 0x7F
+        if n == 126:
+            n = struct.unpack(">H", await self.reader.readexactly(2))[0]
+        elif n == 127:
+            n = struct.unpack(">Q", await self.reader.readexactly(8))[0]
+        if n > self.max_message:
+            raise HttpError(413, "frame too large")
+        mask = await self.reader.readexactly(4) if h[1] & 0x80 else None
+        data = await self.reader.readexactly(n)
+        return fin, op, (self._unmask(data, mask) if mask else data)
+
+    async def recv(self) -> Optional[Tuple[int, bytes]]:
+        """(opcode, payload)。close なら None"""
+        parts, first_op = [], None
+        while True:
+            fin, op, data = await self._frame()
+            if op == 0x8:
+                await self.close()
+                return None
+            if op == 0x9:
+                await self.send(0xA, data)
+                continue
+            if op == 0xA:
+                continue
+            if op != 0x0:
+                first_op = op
+            parts.append(data)
+            if fin:
+                return first_op or 0x2, b"".join(parts)
+
+    async def send(self, op: int, payload: bytes) -> None:
+        n = len(payload)
+        if n < 126:
+            head = struct.pack(">BB", 0x80 | op, n)
+        elif n < 1 << 16:
+            head = struct.pack(">BBH", 0x80 | op, 126, n)
+        else:
+            head = struct.pack(">BBQ", 0x80 | op, 127, n)
+        async with self._send_lock:
+            self.writer.write(head + payload)
+            await self.writer.drain()
+
+    async def send_json(self, obj: Dict[str, Any]) -> None:
+        await self.send(0x1, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+    async def close(self, code: int = 1000) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.send(0x8, struct.pack(">H", code))
+        except ConnectionError:
+            pass
+
+class StreamSession:
+    """WebSocket 1 本ぶんの VAD 状態。発話ごとの応答は順番に処理する"""
+
+    def __init__(self, service: "ResponderService", ws: WebSocket, rate: int):
+        cfg = service.cfg
+        self.service = service
+        self.ws = ws
+        self.rate = cfg.rate
+        self.rec = VADRecorder(rate=cfg.rate, block_ms=cfg.block_ms, energy_threshold=cfg.energy_threshold,
+                               min_speech_ms=cfg.min_speech_ms, min_silence_ms=cfg.min_silence_ms,
+                               capture_rate=rate, max_utterance_ms=cfg.max_utterance_ms,
+                               endpointer=build_endpointer(cfg))  # partial はイベントループを止めるので使わない
+        self.resampler = PolyphaseResampler(rate, cfg.rate) if rate != cfg.rate else None
+        self.pending = np.zeros(0, dtype=np.float32)
+        self._odd = b""  # 奇数バイトで切れたフレームの端（次のフレームの先頭に付ける）
+        self.utts: asyncio.Queue = asyncio.Queue()
+
+    async def _responder(self) -> None:
+        while True:
+            utter = await self.utts.get()
+            try:
+                res = await self.service.respond(utter)
+                await self.ws.send_json({"type": "transcript", "text": res["transcript"]})
+                await self.ws.send_json({"type": "response", "say": res["say"]})
+                if res["wav"]:
+                    await self.ws.send(0x2, res["wav"])
+            except ConnectionError:
+                pass
+            except Exception as e:
+                # 1 発話の失敗でセッションの応答を止めない（eos の join も待ち続けてしまう）
+                print(f"[Server] respond failed: {e!r}")
+                try:
+                    await self.ws.send_json({"type": "error", "message": f"respond failed: {e}"})
+                except ConnectionError:
+                    pass
+            finally:
+                self.utts.task_done()
+
+    async def _feed(self, pcm: bytes) -> None:
+        pcm = self._odd + pcm
+        n = len(pcm) // 2 * 2
+        self._odd = pcm[n:]
+        x = pcm16_to_float(pcm[:n])
+        if self.resampler is not None:
+            x = self.resampler.process(x)
+        self.pending = np.concatenate([self.pending, x])
+        B = self.rec.block_samples
+        k = 0
+        while len(self.pending) - k >= B:
+            was = self.rec.in_speech
+            utter = self.rec.feed(self.pending[k:k + B])
+            k += B
+            if not was and self.rec.in_speech:
+                await self.ws.send_json({"type": "vad", "event": "start"})
+            if utter is not None:
+                await self.ws.send_json({"type": "vad", "event": "end", "duration": round(len(utter) / self.rate, 3)})
+                self.utts.put_nowait(utter)
+        self.pending = self.pending[k:]
+
+    def _flush(self) -> None:
+        """eos: 話し途中なら末尾の無音を除いて発話として扱う"""
+        rec = self.rec
+        if rec.in_speech and rec.buffer:
+            utter = np.concatenate(rec.buffer)
+            tail = rec.silence_blocks * rec.block_samples
+            self.utts.put_nowait(utter[:len(utter) - tail] if len(utter) > tail else utter)
+        rec._reset_utterance()
+
+    async def run(self) -> None:
+        worker = asyncio.create_task(self._responder())
+        try:
+            while True:
+                msg = await self.ws.recv()
+                if msg is None:
+                    break
+                op, data = msg
+                if op == 0x2:
+                    await self._feed(data)
+                    continue
+                try:
+                    ctrl = json.loads(data.decode("utf-8"))
+                except ValueError:
+                    await self.ws.send_json({"type": "error", "message": "bad control message"})
+                    continue
+                if not isinstance(ctrl, dict):
+                    await self.ws.send_json({"type": "error", "message": "control message must be an object"})
+                    continue
+                if ctrl.get("type") == "eos":
+                    self._flush()
+                    await self.utts.join()
+                    await self.ws.send_json({"type": "done"})
+        finally:
+            worker.cancel()
+
+class ResponderService:
+    def __init__(self, app: HelloApp, max_workers: int = 4, max_clients: int = 256, max_body: int = MAX_BODY):
+        self.app = app
+        self.cfg = app.cfg
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="respond")
+        self.max_clients = max_clients
+        self.max_body = max_body
+        self.clients = 0
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.pool, fn, *args)
+
+    async def respond(self, utter: np.ndarray) -> Dict[str, Any]:
+        """処理レートの発話波形 -> STT -> キーワード応答 -> TTS"""
+        text = None
+        decision, hit = await self._run(self.app.spot, utter)
+        if decision == "accept":
+            say = self.app._say_for(hit.entry, None)
+        elif decision == "reject":
+            say = None
+        else:
+            if self.app.stt is not None:
+                frame = AudioFrame.from_float(utter, self.cfg.rate)
+                text = await self._run(self.app.stt.transcribe_frame, frame)
+            print(f"[Server] transcript: {text}")
+            say = self.app.reply_for(text)
+        audio = None
+        if say:
+            try:
+                audio = await self._run(self.app.synthesize, say)
+            except Exception as e:
+                print(f"[TTS] speak failed: {e}")
+        return {"transcript": text or "", "say": say, "wav": audio}
+
+    def _rate(self, query: Dict[str, list]) -> int:
+        """?rate= を正の整数として読む（既定は処理レート）"""
+        raw = query.get("rate", [self.cfg.rate])[0]
+        try:
+            rate = int(raw)
+        except ValueError:
+            rate = 0
+        if rate <= 0:
+            raise HttpError(400, f"bad rate: {raw}")
+        return rate
+
+    def _decode_body(self, body: bytes, query: Dict[str, list]) -> np.ndarray:
+        rate = self._rate(query)
+        if not body:
+            raise HttpError(400, "empty body")
+        try:
+            x = AudioFrame.from_bytes(body, rate).resampled(self.cfg.rate).to_float()
+        except (ValueError, struct.error) as e:
+            raise HttpError(400, f"bad audio: {e}")
+        if not len(x):
+            raise HttpError(400, "no audio samples")
+        return x
+
+    async def _route(self, method: str, path: str, query: Dict[str, list], body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if path == "/health":
+            return 200, {"ok": True, "clients": self.clients}
+        if path == "/respond":
+            if method != "POST":
+                raise HttpError(405, "POST audio to /respond")
+            res = await self.respond(self._decode_body(body, query))
+            wav = res.pop("wav")
+            res["wav_b64"] = base64.b64encode(wav).decode("ascii") if wav else None
+            return 200, res
+        raise HttpError(404, f"no route for {path}")
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, obj: Dict[str, Any], keep_alive: bool) -> None:
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("ascii") + body)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients += 1
+        try:
+            while True:
+                try:
+                    raw = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = raw.decode("latin-1").split("\r\n")
+                try:
+                    method, target, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, {"error": "bad request line"}, False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                url = urlsplit(target)
+                query = parse_qs(url.query)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    if self.clients > self.max_clients:
+                        raise HttpError(503, "too many clients")
+                    if url.path == "/stream" and headers.get("upgrade", "").lower() == "websocket":
+                        await self._websocket(reader, writer, headers, query)
+                        break
+                    n = int(headers.get("content-length", "0") or 0)
+                    if n > self.max_body:
+                        raise HttpError(413, "body too large")
+                    body = await reader.readexactly(n) if n else b""
+                    status, obj = await self._route(method.upper(), url.path, query, body)
+                except HttpError as e:
+                    status, obj, keep_alive = e.status, {"error": str(e)}, False
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as e:
+                    print(f"[Server] {method} {url.path} failed: {e!r}")
+                    status, obj, keep_alive = 500, {"error": "internal error"}, False
+                await self._send(writer, status, obj, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    async def _websocket(self, reader, writer, headers: Dict[str, str], query: Dict[str, list]) -> None:
+        key = headers.get("sec-websocket-key")
+        if not key:
+            raise HttpError(400, "missing Sec-WebSocket-Key")
+        rate = self._rate(query)  # 101 を返す前に検証する（後では 400 を返せない）
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("ascii"))
+        await writer.drain()
+        ws = WebSocket(reader, writer, self.max_body)
+        try:
+            await StreamSession(self, ws, rate).run()
+        except HttpError as e:
+            await ws.close(1009 if e.status == 413 else 1002)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            raise
+        except Exception as e:
+            # 101 を返した後なので HTTP のエラー応答は書けない
+            print(f"[Server] stream failed: {e!r}")
+            await ws.close(1011)
+
+async def start(app: HelloApp, host: str = "127.0.0.1", port: int = 8765, **kwargs) -> Tuple[asyncio.AbstractServer, ResponderService]:
+    service = ResponderService(app, **kwargs)
+    server = await asyncio.start_server(service.handle, host, port)
+    return server, service
+
+def main(argv=None):
+    from .cli import build_parser, config_from_args, build_tts, build_stt
+    p = build_parser()
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--max-workers", type=int, default=4, help="STT/TTS thread pool size")
+    p.add_argument("--max-clients", type=int, default=256)
+    a = p.parse_args(argv)
+    cfg = config_from_args(a)
+    cfg.mode = "keyword"
+    tts = build_tts(cfg.tts, engine_url=a.voicevox_url, speaker=a.voicevox_speaker,
+                    speed_scale=a.voicevox_speed, pitch_scale=a.voicevox_pitch,
+                    intonation_scale=a.voicevox_intonation, volume_scale=a.voicevox_volume)
+    stt = build_stt(cfg.stt, workers=cfg.stt_workers, timeout=cfg.stt_timeout)
+    app = HelloApp(cfg, tts, stt)
+    print(f"[Config] {cfg}")
+
+    async def serve():
+        server, _ = await start(app, a.host, a.port, max_workers=a.max_workers, max_clients=a.max_clients)
+        print(f"[Server] listening on http://{a.host}:{a.port} (POST /respond, WS /stream)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n[Exit] Stopping...")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
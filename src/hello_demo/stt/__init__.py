@@ -1,4 +1,5 @@
 from .base import STTBase
 from .google_stt import GoogleSTT
 from .vosk_stt import VoskSTT
-__all__ = ["STTBase","GoogleSTT","VoskSTT"]
\ No newline at end of file
+from .process_stt import ProcessSTT
+__all__ = ["STTBase","GoogleSTT","VoskSTT","ProcessSTT"]
\ No newline at end of file
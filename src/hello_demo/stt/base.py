@@ -1,6 +1,12 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from ..frame import AudioFrame
+
 class STTBase(ABC):
     @abstractmethod
     def transcribe(self, audio_wav_bytes: bytes, sample_rate: int) -> str | None:
-        ...
\ No newline at end of file
+        ...
+
+    def transcribe_frame(self, frame: AudioFrame) -> str | None:
+        """AudioFrame を書き起こす。既定は WAV に詰めて transcribe へ（実装側で直接 PCM を使うよう上書きする）"""
+        return self.transcribe(frame.to_wav(), sample_rate=frame.sample_rate)
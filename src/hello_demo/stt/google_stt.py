@@ -1,5 +1,8 @@
 from __future__ import annotations
-class GoogleSTT:
+from .base import STTBase
+from ..frame import AudioFrame
+
+class GoogleSTT(STTBase):
     def __init__(self):
         try:
             from google.cloud import speech  # type: ignore
@@ -8,11 +11,15 @@ class GoogleSTT:
         self._speech = speech
         self._client = speech.SpeechClient()
     def transcribe(self, audio_wav_bytes: bytes, sample_rate: int) -> str | None:
+        return self.transcribe_frame(AudioFrame.from_bytes(audio_wav_bytes, sample_rate))
+    def transcribe_frame(self, frame: AudioFrame) -> str | None:
         speech = self._speech
-        audio = speech.RecognitionAudio(content=audio_wav_bytes)
+        # ヘッダなしの LINEAR16 をそのまま送る（レートは config 側で指定）
+        frame = frame.mono().pcm16()
+        audio = speech.RecognitionAudio(content=bytes(frame.data))
         config = speech.RecognitionConfig(
             encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=sample_rate,
+            sample_rate_hertz=frame.sample_rate,
             language_code="ja-JP",
             enable_automatic_punctuation=False,
             model="latest_short",
@@ -21,4 +28,4 @@ class GoogleSTT:
         for result in resp.results:
             if result.alternatives:
                 return result.alternatives[0].transcript.strip()
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,223 @@
+from __future__ import annotations
+import atexit, multiprocessing as mp, queue, threading
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional
+from .base import STTBase
+from ..frame import AudioFrame
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """親が作ったセグメントに接続する（子側では unlink の責任を持たない）"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # 3.13+
+    except TypeError:
+        # spawn した子は親と同じ resource_tracker を共有するので、登録はそのまま
+        # （ここで unregister すると親の unlink 時に二重解除になる）
+        return shared_memory.SharedMemory(name=name)
+
+def _stt_worker(conn, factory: Callable[..., STTBase], kwargs: Dict[str, Any]) -> None:
+    """ワーカープロセス: 認識器（モデル）を 1 回だけ作り、共有メモリ上の音声を書き起こす"""
+    try:
+        stt = factory(**kwargs)
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", None))
+    shm = None
+    frame = None
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg is None:
+            break
+        name, nbytes, sample_rate = msg
+        try:
+            if shm is None or shm.name != name:
+                if shm is not None:
+                    shm.close()
+                shm = _attach(name)
+            # 共有メモリ上の PCM を直接参照（close 前にビューを手放す）
+            frame = AudioFrame.from_pcm16(shm.buf[:nbytes], sample_rate)
+            if hasattr(stt, "transcribe_frame"):
+                text = stt.transcribe_frame(frame)
+            else:  # transcribe(bytes) だけのダックタイプ実装
+                text = stt.transcribe(bytes(frame.data), sample_rate=sample_rate)
+            conn.send(("ok", text))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            frame = None
+    if shm is not None:
+        shm.close()
+
+class _Worker:
+    def __init__(self, idx: int):
+        self.idx = idx
+        self.proc = None
+        self.conn = None
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.ready = False       # "ready" を受け取るまで発話を回さない
+        self.restarting = False
+
+class ProcessSTT(STTBase):
+    """
+    認識器をワーカープロセスで動かす STTBase 実装。
+    発話 PCM（AudioFrame）は pickle せず、ワーカーごとの共有メモリに書いて名前と長さだけ送る。
+    モデルはワーカー起動時に 1 回ロード。落ちたら作り直し、timeout 超過はワーカーを
+    殺して None を返す（キャプチャや UI のスレッドを止めない）。作り直し（モデルの再ロード）は
+    バックグラウンドのスレッドで行い、その間のワーカーは飛ばす。全部が作り直し中なら None。
+
+        ProcessSTT(VoskSTT, {"model_path": ..., "grammar_words": [...]}, workers=2)
+    """
+
+    def __init__(self, factory: Callable[..., STTBase], kwargs: Optional[Dict[str, Any]] = None,
+                 workers: int = 1, timeout: float = 30.0, start_timeout: float = 120.0,
+                 shm_bytes: int = 16000 * 2 * 30):
+        self.factory = factory
+        self.kwargs = dict(kwargs or {})
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        self.shm_bytes = shm_bytes
+        self._ctx = mp.get_context("spawn")
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers = [_Worker(i) for i in range(max(1, workers))]
+        self._closed = False
+        self._lock = threading.Lock()
+        try:
+            for w in self._workers:
+                self._start(w)  # 初回は失敗をそのまま例外にする（build_stt の auto フォールバック用）
+                w.ready = True
+                self._idle.put(w)
+        except Exception:
+            self.close()
+            raise
+        atexit.register(self.close)
+        print(f"[STT:proc] {len(self._workers)} x {getattr(factory, '__name__', factory)} ready")
+
+    def _start(self, w: _Worker) -> None:
+        if w.shm is None:
+            w.shm = shared_memory.SharedMemory(create=True, size=self.shm_bytes)
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_stt_worker, args=(child, self.factory, self.kwargs),
+                                 daemon=True, name=f"stt-worker-{w.idx}")
+        proc.start()
+        child.close()
+        try:
+            if not parent.poll(self.start_timeout):
+                raise EOFError("no response")
+            status, msg = parent.recv()
+        except EOFError as e:
+            proc.kill()
+            raise RuntimeError(f"STT worker #{w.idx} did not start: {e}") from e
+        if status != "ready":
+            proc.join(1.0)
+            raise RuntimeError(f"STT worker #{w.idx} failed: {msg}")
+        w.proc, w.conn = proc, parent
+
+    def _kill(self, w: _Worker) -> None:
+        if w.conn is not None:
+            w.conn.close()
+        if w.proc is not None:
+            w.proc.kill()
+            w.proc.join(1.0)
+        w.proc = w.conn = None
+
+    def _restart(self, w: _Worker, why: str) -> None:
+        """ワーカーを殺し、再起動は別スレッドで（呼び出し側はモデルのロードを待たない）"""
+        print(f"[STT:proc] worker #{w.idx} {why} -> restarting")
+        w.ready = False
+        w.restarting = True
+        self._kill(w)
+        threading.Thread(target=self._respawn, args=(w,), daemon=True, name=f"stt-restart-{w.idx}").start()
+
+    def _respawn(self, w: _Worker) -> None:
+        try:
+            if not self._closed:
+                self._start(w)
+        except Exception as e:
+            print(f"[STT:proc] worker #{w.idx} restart failed: {e}")
+        finally:
+            w.restarting = False
+        if self._closed:
+            self._kill(w)
+        elif w.proc is not None:
+            w.ready = True
+            print(f"[STT:proc] worker #{w.idx} ready")
+
+    def _acquire(self) -> Optional[_Worker]:
+        """準備のできた空きワーカーを取る。使用中のワーカーは空くまで待ち、作り直し中のものは飛ばす"""
+        skipped = []
+        try:
+            while len(skipped) < len(self._workers):
+                w = self._idle.get()
+                if w.ready and (w.proc is None or not w.proc.is_alive()):
+                    self._restart(w, "not running")
+                elif not w.ready and not w.restarting:
+                    self._restart(w, "not running")  # 前回の作り直しに失敗している
+                if w.ready:
+                    return w
+                skipped.append(w)
+            return None
+        finally:
+            for s in skipped:
+                self._idle.put(s)
+
+    def _ensure_capacity(self, w: _Worker, n: int) -> None:
+        if w.shm is not None and w.shm.size >= n:
+            return
+        old = w.shm
+        w.shm = shared_memory.SharedMemory(create=True, size=max(n, 2 * (old.size if old else 0)))
+        if old is not None:
+            old.close()
+            old.unlink()
+
+    def transcribe(self, audio_wav_bytes: bytes, sample_rate: int = 16000) -> str | None:
+        return self.transcribe_frame(AudioFrame.from_bytes(audio_wav_bytes, sample_rate))
+
+    def transcribe_frame(self, frame: AudioFrame) -> str | None:
+        if self._closed:
+            raise RuntimeError("ProcessSTT is closed")
+        w = self._acquire()
+        if w is None:
+            print("[STT:proc] no worker ready (restarting)")
+            return None
+        try:
+            pcm = frame.mono().pcm16()
+            n = pcm.nbytes
+            self._ensure_capacity(w, n)
+            w.shm.buf[:n] = pcm.data
+            try:
+                w.conn.send((w.shm.name, n, pcm.sample_rate))
+                if not w.conn.poll(self.timeout):
+                    self._restart(w, f"timed out after {self.timeout}s")
+                    return None
+                status, data = w.conn.recv()
+            except (EOFError, BrokenPipeError, ConnectionResetError, OSError) as e:
+                self._restart(w, f"crashed ({e!r})")
+                return None
+            if status != "ok":
+                print(f"[STT:proc] worker #{w.idx} error: {data}")
+                return None
+            return data
+        finally:
+            self._idle.put(w)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for w in self._workers:
+            if w.conn is not None:
+                try:
+                    w.conn.send(None)
+                except Exception:
+                    pass
+            if w.proc is not None:
+                w.proc.join(1.0)
+            self._kill(w)
+            if w.shm is not None:
+                w.shm.close()
+                w.shm.unlink()
+                w.shm = None
@@ -1,7 +1,25 @@
 from __future__ import annotations
-import io, os, wave, json
+import os, json
 from vosk import Model, KaldiRecognizer
 from .base import STTBase  # ← 既存の抽象基底（ある前提）
+from ..frame import AudioFrame
+
+class VoskStream:
+    """VoskSTT.open_stream() の戻り値。accept() で PCM16 を入れ、partial() で確定分＋途中結果を読む"""
+
+    def __init__(self, rec):
+        self._rec = rec
+        self._final: list[str] = []
+
+    def accept(self, pcm) -> None:
+        if self._rec.AcceptWaveform(bytes(pcm)):
+            txt = json.loads(self._rec.Result()).get("text", "")
+            if txt:
+                self._final.append(txt)
+
+    def partial(self) -> str:
+        p = json.loads(self._rec.PartialResult()).get("partial", "")
+        return " ".join(self._final + ([p] if p else []))
 
 class VoskSTT(STTBase):
     def __init__(self, model_path: str | None = None, grammar_words: list[str] | None = None):
@@ -13,13 +31,7 @@ class VoskSTT(STTBase):
             if grammar_words else None
         )
 
-    def transcribe(self, wav_bytes: bytes, sample_rate: int = 16000) -> str:
-        """
-        wav_bytes（RIFF/WAV or 裸PCM）を擬似ストリーミング処理。
-        環境変数 VOSK_PRINT_PARTIALS=1 で partial を逐次 print。
-        """
-        print_partials = os.getenv("VOSK_PRINT_PARTIALS", "0") == "1"
-
+    def _recognizer(self, sample_rate: int):
         # 認識器の準備（あなたの環境では第3引数が未対応のため渡さない）
         rec = KaldiRecognizer(self._model, sample_rate)
         # 単語境界が不要なら False の方が軽い
@@ -35,19 +47,33 @@ class VoskSTT(STTBase):
             except AttributeError:
                 # かなり古い版のみフォールバック（必要なければ削除可）
                 rec = KaldiRecognizer(self._model, sample_rate, gj)
+        return rec
 
-        # 入力が RIFF/WAV なら PCM を取り出す
-        if len(wav_bytes) >= 12 and wav_bytes[:4] == b"RIFF" and wav_bytes[8:12] == b"WAVE":
-            with wave.open(io.BytesIO(wav_bytes), "rb") as wf:
-                if wf.getframerate() != sample_rate:
-                    raise ValueError(f"sample_rate mismatch: {wf.getframerate()} vs {sample_rate}")
-                if wf.getnchannels() != 1:
-                    raise ValueError("mono required")
-                if wf.getsampwidth() != 2:
-                    raise ValueError("16-bit PCM required")
-                pcm_bytes = wf.readframes(wf.getnframes())
-        else:
-            pcm_bytes = wav_bytes  # すでに裸PCM（16kHz/mono/16bit）想定
+    def open_stream(self, sample_rate: int = 16000) -> "VoskStream":
+        """発話中に少しずつ音声を入れて途中結果（partial）を読むためのストリーム"""
+        return VoskStream(self._recognizer(sample_rate))
+
+    def transcribe(self, wav_bytes: bytes, sample_rate: int = 16000) -> str:
+        """wav_bytes（RIFF/WAV or 裸PCM）用のアダプタ。実処理は transcribe_frame"""
+        frame = AudioFrame.from_bytes(wav_bytes, sample_rate)
+        if frame.sample_rate != sample_rate:
+            raise ValueError(f"sample_rate mismatch: {frame.sample_rate} vs {sample_rate}")
+        return self.transcribe_frame(frame)
+
+    def transcribe_frame(self, frame: AudioFrame) -> str:
+        """
+        PCM16 mono のフレームを擬似ストリーミング処理（WAV の再パースやコピーはしない）。
+        環境変数 VOSK_PRINT_PARTIALS=1 で partial を逐次 print。
+        """
+        print_partials = os.getenv("VOSK_PRINT_PARTIALS", "0") == "1"
+        if frame.channels != 1:
+            raise ValueError("mono required")
+        frame = frame.pcm16()
+        sample_rate = frame.sample_rate
+
+        rec = self._recognizer(sample_rate)
+
+        pcm = frame.data
 
         # 100ms チャンクで擬似ストリーミング
         bytes_per_sec = sample_rate * 2  # 16-bit mono
@@ -55,10 +81,9 @@ class VoskSTT(STTBase):
         i = 0
         last_final = ""
 
-        while i < len(pcm_bytes):
-            chunk = pcm_bytes[i:i+CHUNK]
+        while i < len(pcm):
+            chunk = bytes(pcm[i:i+CHUNK])  # KaldiRecognizer は bytes を要求する
             i += CHUNK
-
             if rec.AcceptWaveform(chunk):
                 res = json.loads(rec.Result())
                 txt = res.get("text", "")
@@ -1,6 +1,14 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from ..frame import AudioFrame
+
 class TTSBase(ABC):
     @abstractmethod
-    def speak(self, text: str) -> None:
-        ...
\ No newline at end of file
+    def speak(self, text: str) -> bytes | None:
+        """WAV(RIFF) バイト列を返す。再生は呼び出し側（WavPlayback）が行う"""
+        ...
+
+    def synthesize_frame(self, text: str) -> AudioFrame | None:
+        """合成結果を AudioFrame で返す（WAV ヘッダを読むだけで PCM はコピーしない）"""
+        wav = self.speak(text)
+        return AudioFrame.from_wav(wav) if wav else None
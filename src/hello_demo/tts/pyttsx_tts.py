@@ -1,19 +1,135 @@
 from __future__ import annotations
-class PyttsxTTS:
-    def __init__(self):
+import importlib.util, multiprocessing as mp, os, tempfile, threading
+from ..frame import AudioFrame
+from .base import TTSBase
+
+def _pick_japanese_voice(engine) -> None:
+    try:
+        voices = engine.getProperty("voices")
+        for v in voices:
+            if "ja" in (getattr(v, "id", "") or "").lower() or "japanese" in (getattr(v, "name", "") or "").lower():
+                engine.setProperty("voice", v.id)
+                break
+    except Exception:
+        pass
+
+def _render_worker(conn) -> None:
+    """専用プロセス側: テキストを受け取り save_to_file で書き出してバイト列を返す（macOS の nsss は拡張子に関係なく AIFF）"""
+    try:
+        import pyttsx3  # type: ignore
+        engine = pyttsx3.init()
+        _pick_japanese_voice(engine)
+    except Exception as e:
+        conn.send(("error", f"pyttsx3 init failed: {e}"))
+        return
+    conn.send(("ready", None))
+    while True:
         try:
-            import pyttsx3  # type: ignore
+            text = conn.recv()
+        except EOFError:
+            break
+        if text is None:
+            break
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            with open(path, "rb") as f:
+                conn.send(("ok", f.read()))
         except Exception as e:
-            raise RuntimeError("pyttsx3 is required for PyttsxTTS") from e
-        self.engine = pyttsx3.init()
+            conn.send(("error", str(e)))
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class PyttsxTTS(TTSBase):
+    """
+    pyttsx3 を別プロセスで動かし、WAV バイト列を返す実装（VoiceVoxTTS と同じ契約）。
+    OS 再生・runAndWait() のブロッキングはワーカー側に閉じ込め、
+    応答が timeout 秒を超えたらワーカーを作り直して例外にする。
+    """
+
+    def __init__(self, timeout: float = 20.0, start_timeout: float = 15.0):
+        if importlib.util.find_spec("pyttsx3") is None:
+            raise RuntimeError("pyttsx3 is required for PyttsxTTS")
+        self.timeout = timeout
+        self.start_timeout = start_timeout
+        # SAPI/COM などはプロセス単位で初期化されるので spawn で素のプロセスを立てる
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Lock()
+        self._proc = None
+        self._conn = None
+        self._start()
+
+    def _start(self) -> None:
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_render_worker, args=(child,), daemon=True, name="pyttsx3-render")
+        proc.start()
+        child.close()
+        try:
+            if not parent.poll(self.start_timeout):
+                raise EOFError("no response")
+            status, msg = parent.recv()
+        except EOFError as e:
+            proc.kill()
+            raise RuntimeError(f"pyttsx3 worker did not start: {e}") from e
+        if status != "ready":
+            proc.join(1.0)
+            raise RuntimeError(msg)
+        self._proc, self._conn = proc, parent
+
+    def _restart(self) -> None:
+        self.close(wait=0.0)  # 固まったワーカーは待たずに落とす
         try:
-            voices = self.engine.getProperty("voices")
-            for v in voices:
-                if "ja" in (getattr(v, "id", "") or "").lower() or "japanese" in (getattr(v, "name", "") or "").lower():
-                    self.engine.setProperty("voice", v.id)
-                    break
-        except Exception:
-            pass
-    def speak(self, text: str) -> None:
-        self.engine.say(text)
-        self.engine.runAndWait()
\ No newline at end of file
+            self._start()
+        except Exception as e:
+            print(f"[TTS:pyttsx3] restart failed: {e}")
+
+    def synth(self, text: str) -> bytes:
+        if not text or text.strip() == "":
+            return b""
+        with self._lock:
+            if self._proc is None or not self._proc.is_alive():
+                self._restart()
+            if self._conn is None:
+                raise RuntimeError("pyttsx3 worker unavailable")
+            try:
+                self._conn.send(text)
+                if not self._conn.poll(self.timeout):
+                    self._restart()
+                    raise RuntimeError(f"pyttsx3 render timed out ({self.timeout}s)")
+                status, data = self._conn.recv()
+            except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+                self._restart()
+                raise RuntimeError(f"pyttsx3 worker died: {e}") from e
+        if status != "ok":
+            raise RuntimeError(f"pyttsx3 render failed: {data}")
+        if len(data) > 44 and data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+            return data
+        if len(data) > 12 and data[:4] == b"FORM":
+            try:
+                return AudioFrame.from_aiff(data).to_wav()
+            except ValueError as e:
+                raise RuntimeError(f"pyttsx3 produced unreadable AIFF: {e}") from e
+        raise RuntimeError("pyttsx3 produced neither WAV nor AIFF output")
+
+    def speak(self, text: str) -> bytes:
+        return self.synth(text)
+
+    def close(self, wait: float = 1.0) -> None:
+        conn, proc = self._conn, self._proc
+        self._conn = self._proc = None
+        if conn is not None:
+            try:
+                conn.send(None)
+            except Exception:
+                pass
+            conn.close()
+        if proc is not None:
+            proc.join(wait)
+            if proc.is_alive():
+                proc.kill()
+                proc.join(1.0)
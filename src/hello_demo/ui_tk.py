@@ -3,8 +3,9 @@ import time, queue
 from tkinter import Tk, Text, END
 from tkinter import ttk
 class SimpleUI:
-    def __init__(self, title: str = "Hello Demo UI"):
+    def __init__(self, title: str = "Hello Demo UI", max_lines: int = 500):
         self.root = Tk(); self.root.title(title)
+        self.max_lines = max_lines  # 長時間稼働でログ表示が伸び続けないよう古い行を捨てる
         self.q: queue.Queue[tuple[str, str]] = queue.Queue()
         frm = ttk.Frame(self.root, padding=8); frm.grid(sticky="nsew")
         self.root.rowconfigure(0, weight=1); self.root.columnconfigure(0, weight=1)
@@ -23,7 +24,11 @@ class SimpleUI:
     def enqueue(self, kind: str, text: str) -> None:
         self.q.put((kind, text))
     def _append(self, widget: Text, text: str) -> None:
-        ts = time.strftime("%H:%M:%S"); widget.insert(END, f"[{ts}] {text}\n"); widget.see(END)
+        ts = time.strftime("%H:%M:%S"); widget.insert(END, f"[{ts}] {text}\n")
+        lines = int(widget.index("end-1c").split(".")[0]) - 1
+        if self.max_lines and lines > self.max_lines:
+            widget.delete("1.0", f"{lines - self.max_lines + 1}.0")
+        widget.see(END)
     def _pump(self):
         try:
             while True:
@@ -0,0 +1,146 @@
+# tools/aec_eval.py
+# ./audio のクリップを混ぜてエコーキャンセラをオフラインで評価する
+#   far  : システムの TTS 応答（スピーカ -> 部屋 -> マイク に回り込む）
+#   near : 利用者の発話
+# AEC なし/ありで VADRecorder が拾う発話数と、エコーのみ区間の ERLE を比べる。
+import argparse, os, sys, wave
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from hello_demo.audio_io import VADRecorder, pcm16_to_float
+from hello_demo.resample import resample
+from hello_demo.aec import PlaybackReference, EchoCanceller
+
+def load(path, rate):
+    with wave.open(path, 'rb') as wf:
+        x = pcm16_to_float(wf.readframes(wf.getnframes()), wf.getnchannels())
+        return resample(x, wf.getframerate(), rate)
+
+def room_ir(rate, latency_ms, rt_ms, rng):
+    # 直接音 + 指数減衰する残響（簡易 RIR）
+    n0 = int(rate * latency_ms / 1000)
+    n = int(rate * rt_ms / 1000)
+    tail = rng.standard_normal(n) * np.exp(-6.9 * np.arange(n) / n) * 0.3
+    h = np.zeros(n0 + n, dtype=np.float32)
+    h[n0] = 1.0
+    h[n0 + 1:] += tail[:len(h) - n0 - 1]
+    return h / np.sqrt(np.sum(h ** 2))
+
+def build_session(args, rng):
+    rate = args.rate
+    far = [load(os.path.join(args.audio_dir, f), rate) for f in args.far]
+    near = [load(os.path.join(args.audio_dir, f), rate) for f in args.near]
+    h = room_ir(rate, args.latency_ms, args.rt_ms, rng)
+    # タイムライン: far 単独 x2 -> near 単独 -> far と near の重なり（ダブルトーク）
+    events = [('far', 0, 1.0), ('far', 1, 5.0), ('near', 0, 9.0), ('far', 0, 12.0), ('near', 1, 12.8)]
+    total = int(rate * 17.0)
+    mic = (rng.standard_normal(total) * 10 ** (args.noise_db / 20)).astype(np.float32)
+    plays = []
+    labels = []
+    for kind, i, t in events:
+        s = int(rate * t)
+        if kind == 'far':
+            x = far[i % len(far)]
+            echo = np.convolve(x, h)[:total - s] * args.echo_gain
+            mic[s:s + len(echo)] += echo
+            plays.append((t, x))
+        else:
+            x = near[i % len(near)][:total - s]
+            mic[s:s + len(x)] += x
+        labels.append((kind, t, t + len(x) / rate))
+    return mic, plays, labels
+
+def run_vad(args, mic, plays, use_aec):
+    rate = args.rate
+    rec = VADRecorder(rate=rate, block_ms=args.block_ms, energy_threshold=args.energy_threshold,
+                      min_speech_ms=args.min_speech_ms, min_silence_ms=args.min_silence_ms,
+                      capture_rate=rate, max_queue_ms=None)  # 全ブロックを先に積むので上限なし
+    aec = None
+    if use_aec:
+        ref = PlaybackReference(rate)
+        for t, x in plays:
+            ref.push(x, rate, t_start=t)  # 再生開始時刻（仮想時計）
+        aec = EchoCanceller(ref, rec.block_samples, tail_ms=args.tail_ms, lead_ms=0)
+        rec.echo_canceller = aec
+    B = rec.block_samples
+    n_blocks = len(mic) // B
+    for k in range(n_blocks):
+        rec.q.put((k * B / rate, mic[k * B:(k + 1) * B]))
+    utts = []
+    while not rec.q.empty():
+        u = rec.get_utterance(timeout=0.5)
+        if u is None:
+            break
+        end = (n_blocks - rec.q.qsize()) * B / rate - rec.min_silence_blocks * B / rate
+        utts.append((end - len(u) / rate, end))
+    return utts, aec
+
+def erle_db(args, mic, plays, labels):
+    rate = args.rate
+    ref = PlaybackReference(rate)
+    for t, x in plays:
+        ref.push(x, rate, t_start=t)
+    B = int(rate * args.block_ms / 1000)
+    aec = EchoCanceller(ref, B, tail_ms=args.tail_ms, lead_ms=0, suppress=False)
+    out = np.concatenate([aec.process(mic[k*B:(k+1)*B], k * B / rate) for k in range(len(mic) // B)])
+    res = []
+    for kind, a, b in labels:
+        if kind != 'far':
+            continue
+        overlap = any(k2 == 'near' and a2 < b and a < b2 for k2, a2, b2 in labels)
+        if overlap:
+            continue
+        i, j = int(a * rate), min(int(b * rate), len(out))
+        res.append(10 * np.log10(np.sum(mic[i:j] ** 2) / (np.sum(out[i:j] ** 2) + 1e-12)))
+    return res
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--audio-dir', default='./audio')
+    ap.add_argument('--far', nargs='+', default=['welcome.wav', 'kocchi.wav'])
+    ap.add_argument('--near', nargs='+', default=['hello.wav', 'teni_totte.wav'])
+    ap.add_argument('--rate', type=int, default=16000)
+    ap.add_argument('--block-ms', type=int, default=20)
+    ap.add_argument('--energy-threshold', type=float, default=0.005)
+    ap.add_argument('--min-speech-ms', type=int, default=150)
+    ap.add_argument('--min-silence-ms', type=int, default=250)
+    ap.add_argument('--echo-gain', type=float, default=0.5)
+    ap.add_argument('--latency-ms', type=float, default=120)
+    ap.add_argument('--rt-ms', type=float, default=150)
+    ap.add_argument('--noise-db', type=float, default=-60)
+    ap.add_argument('--tail-ms', type=int, default=500)
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    mic, plays, labels = build_session(args, rng)
+    print('segments: ' + ', '.join(f'{k}@{a:.1f}-{b:.1f}s' for k, a, b in labels))
+
+    def attribute(utts):
+        hits = []
+        for a, b in utts:
+            kinds = sorted({k for k, s, e in labels if s < b and a < e}) or ['noise']
+            hits.append('+'.join(kinds))
+        return hits
+
+    ok = True
+    for use_aec in (False, True):
+        utts, _ = run_vad(args, mic, plays, use_aec)
+        kinds = attribute(utts)
+        # 起動直後の最初の応答はフィルタが未収束（cold start）なので分けて数える
+        first_far_end = next(e for k, s, e in labels if k == 'far')
+        cold = sum(1 for (a, b), k in zip(utts, kinds) if k == 'far' and a < first_far_end)
+        self_trig = sum(1 for k in kinds if k == 'far') - cold
+        near_hits = sum(1 for k in kinds if 'near' in k)
+        print(f"AEC={'on ' if use_aec else 'off'} utterances={len(utts)} self-triggers={self_trig} "
+              f"(+{cold} cold start) near-end={near_hits}")
+        for (a, b), k in zip(utts, kinds):
+            print(f'    {a:6.2f}-{b:6.2f}s  {k}')
+        if use_aec:
+            ok = self_trig == 0 and near_hits >= 2
+    erle = erle_db(args, mic, plays, labels)
+    print('ERLE (echo-only segments, no suppression): ' + ', '.join(f'{x:.1f} dB' for x in erle))
+    print('PASS' if ok else 'FAIL')
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# tools/bench_keywords.py
+# KeywordMatcher（n-gram 索引）と全件走査のあいまい一致を、エントリ数を変えて比べる
+#   python tools/bench_keywords.py --check keywords.json   # 各パターンを文に埋め込んでも一致するか（FAIL なら終了コード 1）
+import argparse, contextlib, io, json, os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from hello_demo.keywords import KeywordMatcher, normalize, substring_distance
+
+KANA = [chr(c) for c in range(ord('ぁ'), ord('ゖ'))]
+
+def make_entries(n, rng):
+    entries = []
+    for i in range(n):
+        pats = [''.join(rng.choice(KANA, size=rng.integers(4, 9))) for _ in range(rng.integers(1, 4))]
+        entries.append({'match': pats, 'say': f'reply-{i}'})
+    return entries
+
+def mutate(s, rng):
+    # 1 文字置換（認識ゆれの代用）
+    i = rng.integers(0, len(s))
+    return s[:i] + rng.choice(KANA) + s[i + 1:]
+
+def make_queries(entries, n, rng):
+    qs = []
+    for k in range(n):
+        noise = ''.join(rng.choice(KANA, size=rng.integers(5, 15)))
+        if k % 2 == 0:
+            pat = rng.choice(entries[rng.integers(0, len(entries))]['match'])
+            cut = rng.integers(0, len(noise))
+            qs.append(noise[:cut] + mutate(pat, rng) + noise[cut:])
+        else:
+            qs.append(noise)  # 無関係な発話
+    return qs
+
+def linear(entries, q, matcher):
+    best = None
+    for ei, e in enumerate(entries):
+        for p in e['match']:
+            key = normalize(p)
+            k = matcher._allowed(key)
+            d = substring_distance(key, q, k)
+            if d <= k and (best is None or (d / len(key), ei) < best):
+                best = (d / len(key), ei)
+    return best
+
+SENTENCES = ['{}', '{}です', 'それは{}だよ', 'えーと{}ですか']
+
+def check(path):
+    """keywords.json の各パターン（正規表現以外）が、文に埋め込んでも自分のエントリに一致するか"""
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)
+    m = KeywordMatcher(entries)
+    failed = 0
+    for ei, e in enumerate(entries):
+        if e.get('regex'):
+            continue
+        for p in e.get('match') or e.get('keywords') or []:
+            for s in SENTENCES:
+                text = s.format(p)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    r = m.match(text)
+                if r is None or r.index != ei:
+                    failed += 1
+                    print(f'FAIL entry#{ei} {p!r} in {text!r} -> {None if r is None else r.index}')
+    print('PASS' if not failed else f'{failed} failures')
+    return 1 if failed else 0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 5000])
+    ap.add_argument('--queries', type=int, default=200)
+    ap.add_argument('--check', default=None, help='keywords.json: 埋め込み一致を確かめて終わる')
+    args = ap.parse_args()
+    if args.check:
+        sys.exit(check(args.check))
+    rng = np.random.default_rng(0)
+    print(f'{"entries":>8} {"keys":>6} {"index us/q":>11} {"cand/q":>7} {"linear us/q":>12} {"agree":>6}')
+    for n in args.sizes:
+        entries = make_entries(n, rng)
+        m = KeywordMatcher(entries)
+        qs = make_queries(entries, args.queries, rng)
+        with contextlib.redirect_stdout(io.StringIO()):
+            t0 = time.perf_counter()
+            res = [m.match(q) for q in qs]
+            t_idx = (time.perf_counter() - t0) / len(qs)
+        cand = sum(len(m.candidates(normalize(q))) for q in qs) / len(qs)
+        t0 = time.perf_counter()
+        lin = [linear(entries, q, m) for q in qs]
+        t_lin = (time.perf_counter() - t0) / len(qs)
+        agree = sum(1 for a, b in zip(res, lin) if (a is None) == (b is None)) / len(qs)
+        print(f'{n:>8} {len(m):>6} {t_idx*1e6:>11.1f} {cand:>7.1f} {t_lin*1e6:>12.1f} {agree*100:>5.1f}%')
+
+if __name__ == '__main__':
+    main()
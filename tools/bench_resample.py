@@ -0,0 +1,39 @@
+# tools/bench_resample.py
+# PolyphaseResampler のブロックあたり CPU コストを計測する
+import argparse, os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from hello_demo.resample import PolyphaseResampler
+
+PAIRS = [(48000, 16000), (44100, 16000), (32000, 16000), (24000, 48000), (24000, 44100), (16000, 48000)]
+
+def bench(in_rate, out_rate, block_ms, taps, n_blocks):
+    block = int(in_rate * block_ms / 1000)
+    x = (np.random.default_rng(0).standard_normal(block * n_blocks) * 0.1).astype(np.float32)
+    r = PolyphaseResampler(in_rate, out_rate, taps_per_phase=taps)
+    for i in range(min(20, n_blocks)):  # warm-up
+        r.process(x[i*block:(i+1)*block])
+    r.reset()
+    costs = np.empty(n_blocks)
+    for i in range(n_blocks):
+        t0 = time.perf_counter()
+        r.process(x[i*block:(i+1)*block])
+        costs[i] = time.perf_counter() - t0
+    us = costs * 1e6
+    return block, float(np.median(us)), float(np.percentile(us, 99)), float(us.max()), float(costs.sum() / (n_blocks * block_ms / 1000))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--block-ms', type=int, default=20)
+    ap.add_argument('--taps', type=int, default=32)
+    ap.add_argument('--blocks', type=int, default=2000)
+    args = ap.parse_args()
+
+    print(f'block={args.block_ms}ms taps/phase={args.taps} blocks={args.blocks}')
+    print(f'{"in->out":>14} {"samples":>8} {"median us":>10} {"p99 us":>8} {"max us":>8} {"CPU %":>7}')
+    for a, b in PAIRS:
+        n, med, p99, mx, load = bench(a, b, args.block_ms, args.taps, args.blocks)
+        print(f'{a:>6}->{b:<6} {n:>8} {med:>10.1f} {p99:>8.1f} {mx:>8.1f} {load*100:>6.3f}%')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# tools/endpoint_eval.py
+# 発話終端判定（固定 min_silence_ms と AdaptiveEndpointer）を、セッション音声で比べる。
+#   python tools/endpoint_eval.py                          # ./audio のクリップから合成セッションを作って評価
+#   python tools/endpoint_eval.py --sessions ./sessions    # 録音済み: name.wav + name.turns.json（[[開始秒, 終了秒], ...]）
+#   python tools/endpoint_eval.py --write ./sessions       # 合成セッションを保存（聞いて確認・再利用）
+# 合成セッションは 1 ターン = クリップ 1〜3 個。クリップ間の読点程度の間と、クリップ途中で声量を保ったまま
+# 途切れる言いよどみ（200〜700 ms）を入れ、ターンの後は 1.5〜3 秒空ける。
+# 指標: ターン終了から発話が返るまでの遅延、ターン途中で切れた割合（premature）、取りこぼし。
+import argparse, glob, json, os, sys
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from hello_demo.audio_io import VADRecorder
+from hello_demo.endpoint import AdaptiveEndpointer
+from hello_demo.frame import AudioFrame
+
+def load_clip(path, rate):
+    with open(path, 'rb') as f:
+        return np.array(AudioFrame.from_wav(f.read()).mono().resampled(rate).to_float(), dtype=np.float32)
+
+def voiced_span(x, rate, thr):
+    """有声区間の [先頭, 末尾] サンプル（10 ms 単位の RMS が thr 以上）"""
+    hop = rate // 100
+    n = len(x) // hop
+    e = np.sqrt(np.mean(x[:n * hop].reshape(n, hop) ** 2, axis=1))
+    on = np.flatnonzero(e >= thr)
+    if not len(on):
+        return 0, len(x)
+    return on[0] * hop, (on[-1] + 1) * hop
+
+def make_session(clips, rate, rng, turns, thr):
+    speed = rng.uniform(0.85, 1.2)  # 話速（ピッチも動くが評価には十分）
+    parts, labels, t = [], [], 0
+    silence = lambda sec: np.zeros(int(rate * sec), dtype=np.float32)
+    def add(x):
+        nonlocal t
+        parts.append(x)
+        t += len(x)
+    add(silence(rng.uniform(0.5, 1.0)))
+    for _ in range(turns):
+        start = None
+        k = rng.integers(1, 4)
+        for j in range(k):
+            c = clips[rng.integers(len(clips))]
+            c = AudioFrame.from_float(c, int(rate * speed)).resampled(rate).to_float()
+            a, b = voiced_span(c, rate, thr)
+            c = c[a:b]
+            if start is None:
+                start = t
+            if rng.random() < 0.5 and len(c) > rate // 2:
+                # 言いよどみ: 声量の大きいところで途切れて、しばらく黙る
+                hop = rate // 100
+                e = np.sqrt(np.mean(c[:len(c) // hop * hop].reshape(-1, hop) ** 2, axis=1))
+                loud = np.flatnonzero(e >= np.median(e))
+                loud = loud[(loud > 20) & (loud < len(e) - 20)]
+                if len(loud):
+                    cut = int(rng.choice(loud)) * hop
+                    add(c[:cut])
+                    add(silence(rng.uniform(0.2, 0.7) / speed))
+                    c = c[cut:]
+            add(c)
+            if j < k - 1:
+                add(silence(rng.uniform(0.15, 0.5) / speed))  # 読点程度の間
+        labels.append((start / rate, t / rate))
+        add(silence(rng.uniform(1.5, 3.0)))
+    x = np.concatenate(parts)
+    x = x + (0.0005 * rng.standard_normal(len(x))).astype(np.float32)  # 閾値よりずっと小さい背景雑音
+    return x, labels
+
+def load_sessions(d, rate):
+    out = []
+    for wav in sorted(glob.glob(os.path.join(d, '*.wav'))):
+        lab = wav[:-4] + '.turns.json'
+        if not os.path.exists(lab):
+            print(f'[skip] {wav}: no {os.path.basename(lab)}')
+            continue
+        with open(lab, encoding='utf-8') as f:
+            out.append((os.path.basename(wav), load_clip(wav, rate), [tuple(t) for t in json.load(f)]))
+    return out
+
+def run(x, labels, rate, args, endpointer, min_silence_ms):
+    rec = VADRecorder(rate=rate, block_ms=args.block_ms, energy_threshold=args.energy_threshold,
+                      min_speech_ms=args.min_speech_ms, min_silence_ms=min_silence_ms,
+                      max_utterance_ms=None, max_queue_ms=None, endpointer=endpointer)
+    B = rec.block_samples
+    emits = []
+    for i in range(len(x) // B):
+        if rec.feed(x[i * B:(i + 1) * B]) is not None:
+            emits.append((i + 1) * B / rate)
+    lat, cut_turns, missed = [], 0, 0
+    starts = [s for s, _ in labels] + [float('inf')]
+    for k, (s, e) in enumerate(labels):
+        mine = [t for t in emits if s <= t < starts[k + 1]]
+        if any(t < e for t in mine):
+            cut_turns += 1
+        after = [t for t in mine if t >= e]
+        if after:
+            lat.append(after[0] - e)
+        else:
+            missed += 1
+    return lat, cut_turns, missed
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--clips', nargs='+', default=None, help='合成に使う WAV（既定 ./audio/*.wav）')
+    ap.add_argument('--sessions', default=None, help='録音済みセッションのディレクトリ')
+    ap.add_argument('--write', default=None, help='合成セッションを保存する先')
+    ap.add_argument('--n-sessions', type=int, default=40)
+    ap.add_argument('--turns', type=int, default=6)
+    ap.add_argument('--rate', type=int, default=16000)
+    ap.add_argument('--block-ms', type=int, default=20)
+    ap.add_argument('--energy-threshold', type=float, default=0.005)
+    ap.add_argument('--min-speech-ms', type=int, default=150)
+    ap.add_argument('--fixed', type=int, nargs='+', default=[150, 250, 400, 600, 800])
+    ap.add_argument('--adaptive-base', type=int, nargs='+', default=[250, 400, 550])
+    ap.add_argument('--endpoint-min-ms', type=int, default=120)
+    ap.add_argument('--endpoint-max-ms', type=int, default=900)
+    ap.add_argument('--vosk-model', default=None, help='指定すると adaptive+partial も評価する')
+    ap.add_argument('--seed', type=int, default=0)
+    args = ap.parse_args()
+    rate = args.rate
+    rng = np.random.default_rng(args.seed)
+
+    if args.sessions:
+        sessions = load_sessions(args.sessions, rate)
+    else:
+        paths = args.clips or sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'audio', '*.wav')))
+        clips = [load_clip(p, rate) for p in paths]
+        sessions = []
+        for i in range(args.n_sessions):
+            x, labels = make_session(clips, rate, rng, args.turns, args.energy_threshold)
+            sessions.append((f'synth_{i:03d}.wav', x, labels))
+        if args.write:
+            os.makedirs(args.write, exist_ok=True)
+            for name, x, labels in sessions:
+                with open(os.path.join(args.write, name), 'wb') as f:
+                    f.write(AudioFrame.from_float(x, rate).to_wav())
+                with open(os.path.join(args.write, name[:-4] + '.turns.json'), 'w', encoding='utf-8') as f:
+                    json.dump([[round(s, 3), round(e, 3)] for s, e in labels], f)
+    n_turns = sum(len(l) for _, _, l in sessions)
+    print(f'{len(sessions)} sessions, {n_turns} turns')
+
+    configs = [(f'fixed {ms}', ms, lambda ms=ms: None) for ms in args.fixed]
+    for base in args.adaptive_base:
+        configs.append((f'adaptive {base}', base, lambda base=base: AdaptiveEndpointer(
+            args.block_ms, base_ms=base, min_ms=args.endpoint_min_ms, max_ms=args.endpoint_max_ms)))
+    if args.vosk_model:
+        from hello_demo.stt import VoskSTT
+        stt = VoskSTT(model_path=args.vosk_model)
+        for base in args.adaptive_base:
+            configs.append((f'adaptive+partial {base}', base, lambda base=base: AdaptiveEndpointer(
+                args.block_ms, base_ms=base, min_ms=args.endpoint_min_ms, max_ms=args.endpoint_max_ms,
+                stream_factory=lambda: stt.open_stream(rate))))
+
+    print(f'{"config":<24} {"lat p50":>8} {"lat p90":>8} {"lat mean":>9} {"premature":>10} {"missed":>7}')
+    import contextlib, io
+    for name, ms, make in configs:
+        lat, cut, missed = [], 0, 0
+        for _, x, labels in sessions:
+            with contextlib.redirect_stdout(io.StringIO()):  # [VAD]/[Endpoint] ログは出さない
+                l, c, m = run(x, labels, rate, args, make(), ms)
+            lat += l
+            cut += c
+            missed += m
+        lat_ms = np.array(lat) * 1000 if lat else np.array([np.nan])
+        print(f'{name:<24} {np.median(lat_ms):>6.0f}ms {np.percentile(lat_ms, 90):>6.0f}ms {lat_ms.mean():>7.0f}ms '
+              f'{cut / n_turns * 100:>9.1f}% {missed:>7d}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# tools/kws_eval.py
+# キーワードスポッタ（hello_demo.kws）の閾値を、batch の結果 JSONL を正解にして評価する。
+#   python -m hello_demo.batch ./recordings --keywords-file keywords.json --out result.jsonl
+#   python tools/kws_eval.py result.jsonl --keywords-file keywords.json
+# 正解は expect があればそれ、無ければ STT＋マッチャの結果（match）。
+# reject/accept の組ごとに、省ける STT 呼び出し（件数・秒数）と失う再現率を出す。
+import argparse, json, os, sys, time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from hello_demo.batch import NO_MATCH, entry_label
+from hello_demo.frame import AudioFrame
+from hello_demo.kws import KeywordSpotter
+
+def load_results(path):
+    recs = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            r = json.loads(line)
+            if 'error' not in r:
+                recs.append(r)
+    return recs
+
+def evaluate(rows, reject, accept, complete):
+    """rows: (truth, stt_label, kws_label, score, stt_s)"""
+    n = len(rows)
+    pos = sum(1 for r in rows if r[0] != NO_MATCH)
+    calls = secs = lost = acc_wrong = correct = 0
+    total_s = sum(r[4] for r in rows) or 1e-9
+    for truth, stt_label, kws_label, score, stt_s in rows:
+        if accept > 0 and kws_label != NO_MATCH and score <= accept:
+            pred = kws_label
+            acc_wrong += pred != truth
+        elif complete and score > reject:
+            pred = NO_MATCH
+            lost += truth != NO_MATCH
+        else:
+            calls += 1
+            pred = stt_label
+            secs += stt_s
+        correct += pred == truth
+    return {
+        'reject': reject, 'accept': accept,
+        'stt_calls_saved': round(1 - calls / n, 4) if n else 0.0,
+        'stt_sec_saved': round(1 - secs / total_s, 4),
+        'recall_lost': round(lost / pos, 4) if pos else 0.0,
+        'accept_errors': acc_wrong,
+        'accuracy': round(correct / n, 4) if n else 0.0,
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('results', help='hello_demo.batch の --out（JSONL）')
+    ap.add_argument('--keywords-file', required=True, help='"examples" 付きの keywords.json')
+    ap.add_argument('--rate', type=int, default=16000)
+    ap.add_argument('--reject', type=float, nargs='+', default=[0.25, 0.3, 0.35, 0.4, 0.45, 0.5])
+    ap.add_argument('--accept', type=float, nargs='+', default=[0.0, 0.05, 0.1])
+    ap.add_argument('--out', default=None, help='全組の結果と発話ごとのスコアを JSON で保存')
+    args = ap.parse_args()
+
+    with open(args.keywords_file, encoding='utf-8') as f:
+        entries = json.load(f)
+    ks = KeywordSpotter(entries, base_dir=os.path.dirname(args.keywords_file) or '.', rate=args.rate)
+    if not len(ks):
+        sys.exit('no "examples" in keywords file')
+    if not ks.complete:
+        print('[kws_eval] some entries have no examples: reject never applies')
+
+    recs = load_results(args.results)
+    base = os.path.dirname(args.results)
+    rows, per_file = [], []
+    t_kws = 0.0
+    for r in recs:
+        path = r['path'] if os.path.isabs(r['path']) or os.path.exists(r['path']) else os.path.join(base, r['path'])
+        with open(path, 'rb') as f:
+            x = AudioFrame.from_wav(f.read()).mono().resampled(args.rate).to_float()
+        t0 = time.perf_counter()
+        hit = ks.spot(x, args.rate)
+        t_kws += time.perf_counter() - t0
+        truth = r.get('expect', r.get('match', NO_MATCH))
+        kws_label = entry_label(hit.entry)
+        rows.append((truth, r.get('match', NO_MATCH), kws_label, hit.score, float(r.get('stt_s') or 0.0)))
+        per_file.append({'path': r['path'], 'truth': truth, 'kws': kws_label, 'score': round(hit.score, 4)})
+
+    n = len(rows)
+    stt_total = sum(r[4] for r in rows)
+    print(f'{n} utterances, {sum(1 for r in rows if r[0] != NO_MATCH)} with a keyword | '
+          f'STT {stt_total:.1f}s total ({stt_total / max(n, 1) * 1000:.0f} ms/utt) | '
+          f'KWS {t_kws / max(n, 1) * 1000:.1f} ms/utt')
+    pos = np.array([r[3] for r in rows if r[0] != NO_MATCH])
+    neg = np.array([r[3] for r in rows if r[0] == NO_MATCH])
+    for name, s in (('keyword', pos), ('no keyword', neg)):
+        s = s[np.isfinite(s)]
+        if len(s):
+            print(f'  score {name:<10}: p10 {np.percentile(s, 10):.3f}  p50 {np.median(s):.3f}  p90 {np.percentile(s, 90):.3f}')
+
+    print(f'{"reject":>7} {"accept":>7} {"calls saved":>12} {"sec saved":>10} {"recall lost":>12} {"acc err":>8} {"accuracy":>9}')
+    table = []
+    for a in args.accept:
+        for rj in args.reject:
+            e = evaluate(rows, rj, a, ks.complete)
+            table.append(e)
+            print(f'{rj:>7.3f} {a:>7.3f} {e["stt_calls_saved"] * 100:>11.1f}% {e["stt_sec_saved"] * 100:>9.1f}% '
+                  f'{e["recall_lost"] * 100:>11.1f}% {e["accept_errors"]:>8d} {e["accuracy"] * 100:>8.1f}%')
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'table': table, 'files': per_file}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
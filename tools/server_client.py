@@ -0,0 +1,148 @@
+# tools/server_client.py
+# hello_demo.server を localhost で叩く確認用クライアント（標準ライブラリのみ）
+#   python tools/server_client.py --wav audio/hello.wav --mode both --clients 8
+import argparse, base64, json, os, socket, struct, threading, time, wave
+import http.client
+from urllib.parse import urlsplit
+
+def post_respond(url, path):
+    u = urlsplit(url)
+    with open(path, 'rb') as f:
+        body = f.read()
+    t0 = time.perf_counter()
+    conn = http.client.HTTPConnection(u.hostname, u.port, timeout=60)
+    conn.request('POST', '/respond', body=body, headers={'Content-Type': 'audio/wav'})
+    res = conn.getresponse()
+    data = json.loads(res.read().decode('utf-8'))
+    conn.close()
+    wav = base64.b64decode(data.pop('wav_b64')) if data.get('wav_b64') else b''
+    return res.status, data, wav, time.perf_counter() - t0
+
+class WSClient:
+    def __init__(self, url, rate):
+        u = urlsplit(url)
+        self.sock = socket.create_connection((u.hostname, u.port), timeout=60)
+        key = base64.b64encode(os.urandom(16)).decode()
+        self.sock.sendall((f'GET /stream?rate={rate} HTTP/1.1\r\nHost: {u.hostname}\r\n'
+                           f'Upgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Key: {key}\r\n'
+                           'Sec-WebSocket-Version: 13\r\n\r\n').encode())
+        head = b''
+        while b'\r\n\r\n' not in head:
+            head += self.sock.recv(1)
+        if b' 101 ' not in head.split(b'\r\n')[0]:
+            raise RuntimeError(head.decode(errors='replace'))
+
+    def send(self, op, payload):
+        mask = os.urandom(4)
+        n = len(payload)
+        head = bytes([0x80 | op])
+        if n < 126:
+            head += bytes([0x80 | n])
+        elif n < 65536:
+            head += bytes([0x80 | 126]) + struct.pack('>H', n)
+        else:
+            head += bytes([0x80 | 127]) + struct.pack('>Q', n)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.sock.sendall(head + mask + masked)
+
+    def _read(self, n):
+        buf = b''
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError('closed')
+            buf += chunk
+        return buf
+
+    def recv(self):
+        h = self._read(2)
+        op, n = h[0] & 0x0F, h[1] & 0x7F
+        if n == 126:
+            n = struct.unpack('>H', self._read(2))[0]
+        elif n == 127:
+            n = struct.unpack('>Q', self._read(8))[0]
+        return op, self._read(n)
+
+def stream(url, path, speed, block_ms=20):
+    with wave.open(path, 'rb') as wf:
+        rate, pcm = wf.getframerate(), wf.readframes(wf.getnframes())
+    pcm += b'\0\0' * int(rate * 0.6)  # 末尾に無音（発話終端を検出させる）
+    ws = WSClient(url, rate)
+    events, wavs = [], []
+    done = threading.Event()
+
+    def reader():
+        while not done.is_set():
+            op, data = ws.recv()
+            if op == 0x1:
+                ev = json.loads(data.decode('utf-8'))
+                events.append((time.perf_counter(), ev))
+                if ev.get('type') == 'done':
+                    done.set()
+            elif op == 0x2:
+                wavs.append(data)
+            elif op == 0x8:
+                done.set()
+
+    th = threading.Thread(target=reader, daemon=True)
+    th.start()
+    step = int(rate * block_ms / 1000) * 2
+    t0 = time.perf_counter()
+    for i in range(0, len(pcm), step):
+        ws.send(0x2, pcm[i:i + step])
+        if speed > 0:
+            time.sleep(block_ms / 1000 / speed)
+    ws.send(0x1, json.dumps({'type': 'eos'}).encode())
+    done.wait(60)
+    ws.send(0x8, struct.pack('>H', 1000))
+    return [(round(t - t0, 3), ev) for t, ev in events], wavs
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--url', default='http://127.0.0.1:8765')
+    ap.add_argument('--wav', nargs='+', default=['./audio/hello.wav'])
+    ap.add_argument('--mode', choices=['respond', 'stream', 'both'], default='both')
+    ap.add_argument('--clients', type=int, default=1)
+    ap.add_argument('--speed', type=float, default=1.0, help='stream pacing vs real time (0 = no pacing)')
+    ap.add_argument('--out-dir', default=None)
+    args = ap.parse_args()
+
+    results = []
+    lock = threading.Lock()
+
+    def client(idx):
+        path = args.wav[idx % len(args.wav)]
+        if args.mode in ('respond', 'both'):
+            status, data, wav, dt = post_respond(args.url, path)
+            with lock:
+                results.append(('respond', idx, status == 200, dt, data, len(wav)))
+            if args.out_dir and wav:
+                with open(os.path.join(args.out_dir, f'respond_{idx}.wav'), 'wb') as f:
+                    f.write(wav)
+        if args.mode in ('stream', 'both'):
+            t0 = time.perf_counter()
+            events, wavs = stream(args.url, path, args.speed)
+            ok = any(ev.get('type') == 'done' for _, ev in events)
+            with lock:
+                results.append(('stream', idx, ok, time.perf_counter() - t0, events, sum(map(len, wavs))))
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    ths = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    t0 = time.perf_counter()
+    for th in ths:
+        th.start()
+    for th in ths:
+        th.join()
+    for kind, idx, ok, dt, info, nbytes in sorted(results, key=lambda r: (r[0], r[1])):
+        print(f'[{kind} #{idx}] ok={ok} {dt:.2f}s audio={nbytes}B')
+        if kind == 'respond':
+            print(f'    {info}')
+        else:
+            for t, ev in info:
+                print(f'    {t:7.3f}s {ev}')
+    n_ok = sum(1 for r in results if r[2])
+    print(f'{n_ok}/{len(results)} ok in {time.perf_counter() - t0:.2f}s')
+
+if __name__ == '__main__':
+    main()
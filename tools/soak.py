@@ -0,0 +1,322 @@
+# tools/soak.py
+# HelloApp の長時間稼働テスト。合成音声（または WAV の再生）を実時間より速く流し込み、
+# STT/TTS/再生はスタブにして、メモリ・キュー・遅延がじわじわ伸びないかを見る。
+#   python tools/soak.py --hours 4 --speed 120 --keywords-file keywords.json
+#   python tools/soak.py --hours 1 --wav audio/hello.wav audio/kattekatte.wav --ui
+# どれかが上限を超えたら終了コード 1。
+import contextlib, gc, os, statistics, sys, threading, time, tracemalloc
+from collections import deque
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from hello_demo.app import HelloApp
+from hello_demo.audio_io import VADRecorder
+from hello_demo.cli import build_parser, config_from_args
+from hello_demo.frame import AudioFrame
+from hello_demo.playback import WavPlayback
+from hello_demo.stt import STTBase
+from hello_demo.tts import TTSBase
+
+OUT = sys.__stdout__
+
+def log(msg):
+    print(msg, file=OUT, flush=True)
+
+def rss_mb():
+    """常駐メモリ（MB）。psutil -> /proc -> 取れなければ None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except Exception:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# ---- 音源 ----
+def synthetic_turns(rate, rng, noise_every):
+    """(音声, 種別) を無限に返す。発話らしい断続音と、ときどき長い騒音"""
+    k = 0
+    while True:
+        k += 1
+        if noise_every and k % noise_every == 0:
+            n = int(rate * rng.uniform(20, 40))
+            yield (0.05 * rng.standard_normal(n)).astype(np.float32)
+            continue
+        n = int(rate * rng.uniform(0.4, 3.0))
+        t = np.arange(n) / rate
+        f0 = rng.uniform(100, 250)
+        env = 0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(3, 6) * t)  # 音節っぽい振幅変動
+        x = env * (0.2 * np.sin(2 * np.pi * f0 * t) + 0.1 * np.sin(2 * np.pi * 2.7 * f0 * t))
+        yield (x + 0.01 * rng.standard_normal(n)).astype(np.float32)
+
+def replay_turns(paths, rate):
+    clips = []
+    for p in paths:
+        with open(p, 'rb') as f:
+            clips.append(np.array(AudioFrame.from_wav(f.read()).resampled(rate).to_float(), dtype=np.float32))
+    while True:
+        yield from clips
+
+def blocks(turns, rate, block_samples, rng):
+    """発話の間に 0.3〜2 秒の静音（閾値より十分小さい雑音）を挟んでブロックに切る"""
+    pending = np.zeros(0, dtype=np.float32)
+    for x in turns:
+        gap = (0.0005 * rng.standard_normal(int(rate * rng.uniform(0.3, 2.0)))).astype(np.float32)
+        pending = np.concatenate([pending, x, gap])
+        n = len(pending) // block_samples * block_samples
+        for i in range(0, n, block_samples):
+            yield pending[i:i + block_samples].copy()
+        pending = pending[n:]
+
+# ---- 差し替え部品 ----
+class ReplayRecorder(VADRecorder):
+    """sounddevice の代わりに音源ブロックを speed 倍速で q に入れる"""
+
+    def __init__(self, source, speed, **kwargs):
+        super().__init__(**kwargs)
+        self.source = source
+        self.speed = speed
+        self.fed_sec = 0.0
+        self.last_t0 = None  # 直近に取り出したブロックの投入時刻
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.capture_rate = self.rate
+        self._thread = threading.Thread(target=self._pump, daemon=True, name='soak-feed')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    def _pump(self):
+        sec = self.block_ms / 1000.0
+        t_start = time.monotonic()
+        for block in self.source:
+            if self._stop.is_set():
+                break
+            self._put((time.monotonic(), block))
+            self.fed_sec += sec
+            ahead = t_start + self.fed_sec / self.speed - time.monotonic()
+            if ahead > 0.005:
+                time.sleep(ahead)
+
+class _TapQueue:
+    """q.get() で取り出したブロックの投入時刻を recorder に覚えさせる"""
+
+    def __init__(self, rec):
+        self.rec = rec
+        self.q = rec.q
+
+    def __getattr__(self, name):
+        return getattr(self.q, name)
+
+    def get(self, *args, **kwargs):
+        item = self.q.get(*args, **kwargs)
+        self.rec.last_t0 = item[0]
+        return item
+
+class StubSTT(STTBase):
+    def __init__(self, texts, delay):
+        self.texts = texts
+        self.delay = delay
+        self.calls = 0
+        self.audio_sec = 0.0
+
+    def transcribe(self, audio_wav_bytes, sample_rate=16000):
+        return self.transcribe_frame(AudioFrame.from_bytes(audio_wav_bytes, sample_rate))
+
+    def transcribe_frame(self, frame):
+        time.sleep(self.delay)
+        self.calls += 1
+        self.audio_sec += frame.duration
+        return self.texts[self.calls % len(self.texts)]
+
+class StubTTS(TTSBase):
+    def __init__(self, rate=24000, sec=0.6):
+        t = np.arange(int(rate * sec)) / rate
+        self.wave = (0.2 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+        self.rate = rate
+
+    def speak(self, text):
+        return AudioFrame.from_float(self.wave, self.rate).to_wav()  # 毎回新しい bytes（実物と同じ）
+
+class StubPlayback(WavPlayback):
+    """鳴らさずに、応答までの遅延を記録する（再生時間は speed 倍速で待つ）"""
+
+    def __init__(self, rec, speed, window):
+        super().__init__(output_rate=0)
+        self.rec = rec
+        self.speed = speed
+        self.plays = 0
+        self.recent = deque(maxlen=window)
+
+    def play_frame(self, frame):
+        if frame is None:
+            return
+        if self.rec.last_t0 is not None:
+            self.recent.append(time.monotonic() - self.rec.last_t0)
+        self.plays += 1
+        frame = self._match_device_rate(frame).pcm16()
+        if self.reference is not None:
+            self._push_reference(frame)
+        time.sleep(frame.duration / self.speed)
+
+def keyword_texts(app):
+    texts = []
+    for e in app.keyword_map or []:
+        pats = e.get('match') or e.get('keywords') or []
+        if pats:
+            texts.append(pats[0])
+    texts = texts or [app.cfg.keyword]
+    return texts + ['今日はいい天気ですね']  # マッチしない雑談も混ぜる
+
+def main():
+    ap = build_parser()
+    ap.description = 'HelloApp soak test'
+    ap.add_argument('--hours', type=float, default=1.0, help='流し込む音声の長さ（時間）')
+    ap.add_argument('--speed', type=float, default=60.0, help='実時間に対する倍率')
+    ap.add_argument('--wav', nargs='*', default=None, help='合成音の代わりに再生する WAV')
+    ap.add_argument('--noise-every', type=int, default=25, help='N 発話ごとに 20-40 秒の騒音（0=なし）')
+    ap.add_argument('--stt-ms', type=float, default=20.0, help='スタブ STT の処理時間')
+    ap.add_argument('--sample-sec', type=float, default=5.0)
+    ap.add_argument('--warmup-frac', type=float, default=0.1)
+    ap.add_argument('--window', type=int, default=200, help='遅延の比較に使う応答数')
+    ap.add_argument('--top', type=int, default=10)
+    ap.add_argument('--no-tracemalloc', action='store_true')
+    ap.add_argument('--trace-frames', type=int, default=1, help='tracemalloc のスタック深さ（深いほど遅い）')
+    ap.add_argument('--ui', action='store_true', help='Tk の SimpleUI にも流す（要ディスプレイ）')
+    ap.add_argument('--verbose', action='store_true', help='アプリのログを抑制しない')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--max-rss-growth-mb', type=float, default=50.0)
+    ap.add_argument('--max-traced-growth-mb', type=float, default=10.0)
+    ap.add_argument('--max-queue-blocks', type=int, default=100)
+    ap.add_argument('--max-buffer-sec', type=float, default=20.0)
+    ap.add_argument('--max-drift-ms', type=float, default=100.0)
+    ap.add_argument('--max-dropped', type=int, default=0)
+    ap.add_argument('--max-ui-lines', type=int, default=1000)
+    args = ap.parse_args()
+    cfg = config_from_args(args)
+    rng = np.random.default_rng(args.seed)
+
+    if not args.no_tracemalloc:
+        tracemalloc.start(args.trace_frames)
+    ui = None
+    on_user = on_system = None
+    if args.ui:
+        from hello_demo.ui_tk import SimpleUI
+        ui = SimpleUI('soak')
+        on_user = lambda t: ui.enqueue('user', t or '')
+        on_system = lambda t: ui.enqueue('system', t or '')
+
+    app = HelloApp(cfg, StubTTS(), None, on_user=on_user, on_system=on_system)
+    app.stt = StubSTT(keyword_texts(app), args.stt_ms / 1000.0 / args.speed)
+    block_samples = int(cfg.rate * cfg.block_ms / 1000.0)
+    turns = replay_turns(args.wav, cfg.rate) if args.wav else synthetic_turns(cfg.rate, rng, args.noise_every)
+    rec = ReplayRecorder(blocks(turns, cfg.rate, block_samples, rng), args.speed,
+                         rate=cfg.rate, block_ms=cfg.block_ms, energy_threshold=cfg.energy_threshold,
+                         min_speech_ms=cfg.min_speech_ms, min_silence_ms=cfg.min_silence_ms,
+                         max_utterance_ms=cfg.max_utterance_ms, max_queue_ms=cfg.max_queue_ms,
+                         endpointer=app.build_endpointer())
+    rec.q = _TapQueue(rec)
+    app.playback = StubPlayback(rec, args.speed, args.window)
+
+    total_sec = args.hours * 3600
+    warmup_sec = total_sec * args.warmup_frac
+    log(f'[soak] {args.hours:g} h of audio at x{args.speed:g} (~{total_sec / args.speed / 60:.1f} min wall), '
+        f'mode={cfg.mode} source={"wav" if args.wav else "synthetic"}')
+
+    sink = None if args.verbose else open(os.devnull, 'w')
+    th = threading.Thread(target=lambda: app.run(rec=rec), daemon=True, name='soak-app')
+    stats = {'queue': 0, 'buffer_sec': 0.0, 'ui_lines': 0}
+    base = None  # (rss, traced, snapshot, latency median)
+    first_lat = []
+    t_wall = time.monotonic()
+    next_sample = 0.0
+    with (contextlib.redirect_stdout(sink) if sink else contextlib.nullcontext()):
+        th.start()
+        while rec.fed_sec < total_sec and th.is_alive():
+            if ui is not None:
+                ui.root.update()
+            time.sleep(0.05)
+            stats['queue'] = max(stats['queue'], rec.q.qsize())
+            stats['buffer_sec'] = max(stats['buffer_sec'], len(rec.buffer) * cfg.block_ms / 1000.0)
+            if ui is not None:
+                lines = max(int(w.index('end-1c').split('.')[0]) for w in (ui.txt_user, ui.txt_sys))
+                stats['ui_lines'] = max(stats['ui_lines'], lines)
+            if base is None and rec.fed_sec >= warmup_sec:
+                gc.collect()
+                traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+                snap = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+                base = (rss_mb(), traced, snap)
+                app.playback.recent.clear()  # 遅延の基準は warmup 後の最初の window 件
+                log(f'[soak] baseline after {rec.fed_sec / 3600:.2f} h: rss={base[0]} MB traced={traced / 2**20:.1f} MB')
+            if base is not None and len(first_lat) < args.window and app.playback.recent:
+                first_lat = list(app.playback.recent)
+            if time.monotonic() - t_wall >= next_sample:
+                next_sample += args.sample_sec
+                rss = rss_mb()
+                traced = tracemalloc.get_traced_memory()[0] / 2**20 if tracemalloc.is_tracing() else 0.0
+                lat = statistics.median(app.playback.recent) * 1000 if app.playback.recent else float('nan')
+                log(f'[soak] audio {rec.fed_sec / 3600:6.2f} h | rss {rss or 0:7.1f} MB | traced {traced:6.1f} MB | '
+                    f'q {rec.q.qsize():4d} | buf {len(rec.buffer) * cfg.block_ms / 1000:5.1f} s | '
+                    f'utt {app.stt.calls:6d} | plays {app.playback.plays:6d} | lat p50 {lat:7.1f} ms | '
+                    f'dropped {rec.dropped_blocks}')
+        app.stop()
+        th.join(5.0)
+        rec.stop()
+    if sink:
+        sink.close()
+
+    gc.collect()
+    failures = []
+    def check(name, value, limit, unit=''):
+        ok = value is None or value <= limit
+        log(f'  {name:<20} {value if value is not None else "n/a":>10} {unit:<3} (limit {limit}) {"ok" if ok else "FAIL"}')
+        if not ok:
+            failures.append(name)
+
+    log(f'[soak] done: {rec.fed_sec / 3600:.2f} h audio in {(time.monotonic() - t_wall) / 60:.1f} min, '
+        f'{app.stt.calls} utterances ({app.stt.audio_sec / 60:.1f} min), {app.playback.plays} replies')
+    if base is None:
+        log('[soak] run ended before warmup finished; nothing to compare')
+        return 1
+    rss = rss_mb()
+    traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+    drift = None
+    if first_lat and app.playback.recent:
+        drift = round((statistics.median(app.playback.recent) - statistics.median(first_lat)) * 1000, 1)
+    check('rss growth', round(rss - base[0], 1) if rss is not None and base[0] is not None else None,
+          args.max_rss_growth_mb, 'MB')
+    check('traced growth', round((traced - base[1]) / 2**20, 2), args.max_traced_growth_mb, 'MB')
+    check('max queue depth', stats['queue'], args.max_queue_blocks, 'blk')
+    check('max vad buffer', round(stats['buffer_sec'], 2), args.max_buffer_sec, 's')
+    check('latency drift p50', drift, args.max_drift_ms, 'ms')
+    check('dropped blocks', rec.dropped_blocks, args.max_dropped, 'blk')
+    if ui is not None:
+        check('ui lines', stats['ui_lines'], args.max_ui_lines)
+
+    if base[2] is not None:
+        snap = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        log(f'[soak] top {args.top} allocation growth since baseline:')
+        for st in snap.compare_to(base[2], 'lineno')[:args.top]:
+            log(f'  {st.size_diff / 1024:+9.1f} KiB {st.count_diff:+7d} blocks  {st.traceback[0]}')
+
+    if failures:
+        log(f'[soak] FAIL: {", ".join(failures)}')
+        return 1
+    log('[soak] PASS')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())